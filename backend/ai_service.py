@@ -1,16 +1,49 @@
 import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+import threading
+from .report_cache import build_report_cache, cache_key
+from . import metrics
+from . import rate_limit
 
-load_dotenv()
+MODEL_NAME = "gemini-1.5-flash"
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+# Built on the first real model call: google.generativeai (and the grpc/protobuf
+# stack behind it) is most of the import time, and a cold start serving /login or
+# a cached report shouldn't pay for it
+model = None
+_model_lock = threading.Lock()
 
-model = genai.GenerativeModel("gemini-1.5-flash")
+report_cache = build_report_cache()
 
 
-def generate_evaluation_report(evaluation):
-    prompt = f"""
+def get_model():
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                import google.generativeai as genai
+
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                model = genai.GenerativeModel(MODEL_NAME)
+    return model
+
+
+def set_model(new_model, model_name=None):
+    # Swap in any object with generate_content(prompt) -> .text (fakes in tests/benchmarks).
+    # A different model_name keeps its reports apart in the cache.
+    global model, MODEL_NAME
+    model = new_model
+    if model_name:
+        MODEL_NAME = model_name
+
+
+def set_report_cache(cache):
+    # None disables caching
+    global report_cache
+    report_cache = cache
+
+
+def build_report_prompt(evaluation):
+    return f"""
 You are an HR evaluation assistant.
 
 Generate a structured professional performance report.
@@ -31,6 +64,43 @@ Tasks:
 5. Provide final performance verdict.
 """
 
-    response = model.generate_content(prompt)
 
+def _call_model(prompt):
+    # Only real model calls spend quota; cache hits never get here
+    with metrics.timed(metrics.GEMINI_SECONDS, span="gemini"):
+        rate_limit.gemini_rate_limiter.acquire()
+        response = get_model().generate_content(prompt)
     return response.text
+
+
+def generate_evaluation_report(evaluation):
+    with metrics.timed(metrics.REPORT_SECONDS, span="report"):
+        prompt = build_report_prompt(evaluation)
+
+        if report_cache is None:
+            return _call_model(prompt)
+
+        return report_cache.get_or_generate(prompt, MODEL_NAME, _call_model)
+
+
+def stream_evaluation_report(evaluation):
+    # Same report as generate_evaluation_report, yielded piece by piece as Gemini writes it.
+    # A cached report comes back as one piece; a streamed one is cached once it's complete.
+    prompt = build_report_prompt(evaluation)
+    key = cache_key(prompt, MODEL_NAME)
+
+    if report_cache is not None:
+        report = report_cache.get(key, MODEL_NAME)
+        if report is not None:
+            yield report
+            return
+
+    parts = []
+    with metrics.timed(metrics.GEMINI_SECONDS, span="gemini"):
+        rate_limit.gemini_rate_limiter.acquire()
+        for chunk in get_model().generate_content(prompt, stream=True):
+            parts.append(chunk.text)
+            yield chunk.text
+
+    if report_cache is not None:
+        report_cache.set(key, "".join(parts), MODEL_NAME)
@@ -0,0 +1,209 @@
+from sqlalchemy import BigInteger, case, cast, delete, extract, func, insert, literal, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from . import models
+
+# Aggregates behind GET /hr/analytics.
+# evaluation_stats holds one row per (manager, cohort month, status) with the count,
+# the sum of final ratings (rating + hr_rating_adjustment) and the sum of completion
+# times, so the endpoint reads a table sized by managers x months x statuses instead
+# of scanning evaluations.
+# Workflow writes call record() after flush and before commit, with the evaluation's
+# contribution() before and after the change; the deltas are applied as upserts in
+# the same transaction. `python -m backend.analytics --rebuild` recomputes the table
+# from evaluations and `--check` compares it against a brute-force recomputation.
+
+STATUSES = ["pending_intern", "pending_hr", "completed"]
+KEY_COLUMNS = ["manager_id", "cohort", "status"]
+VALUE_COLUMNS = ["evaluations", "rating_total", "completion_seconds", "timed_completions"]
+UNKNOWN_COHORT = "unknown"
+
+stats_table = models.EvaluationStats.__table__
+
+
+def cohort_of(created_at):
+    return created_at.strftime("%Y-%m") if created_at else UNKNOWN_COHORT
+
+
+def completion_seconds(created_at, completed_at):
+    # Whole seconds, truncated the same way as the SQL used by rebuild()
+    if created_at is None or completed_at is None:
+        return None
+    return int((completed_at.replace(microsecond=0) - created_at.replace(microsecond=0)).total_seconds())
+
+
+def contribution(evaluation):
+    # What one evaluation adds to the table: (key, values in VALUE_COLUMNS order)
+    seconds = completion_seconds(evaluation.created_at, evaluation.completed_at)
+    key = (evaluation.manager_id, cohort_of(evaluation.created_at), evaluation.status)
+    return key, (
+        1,
+        evaluation.rating + (evaluation.hr_rating_adjustment or 0),
+        seconds or 0,
+        0 if seconds is None else 1,
+    )
+
+
+def _upsert(dialect):
+    statement = (pg_insert if dialect == "postgresql" else sqlite_insert)(stats_table)
+    return statement.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={c: stats_table.c[c] + statement.excluded[c] for c in VALUE_COLUMNS},
+    )
+
+
+async def record(db, added=(), removed=()):
+    # added/removed: contribution() tuples; a status change is one of each
+    deltas = {}
+    for sign, items in ((1, added), (-1, removed)):
+        for key, values in items:
+            totals = deltas.setdefault(key, [0] * len(VALUE_COLUMNS))
+            for i, value in enumerate(values):
+                totals[i] += sign * value
+
+    rows = [
+        {**dict(zip(KEY_COLUMNS, key)), **dict(zip(VALUE_COLUMNS, totals))}
+        for key, totals in deltas.items()
+        if any(totals)
+    ]
+    if rows:
+        await db.execute(_upsert(db.bind.dialect.name), rows)
+
+
+def _brute_force_select(dialect):
+    # The same aggregates computed straight from evaluations
+    e = models.Evaluation
+    if dialect == "postgresql":
+        cohort = func.to_char(e.created_at, "YYYY-MM")
+        epoch = lambda column: cast(extract("epoch", func.date_trunc("second", column)), BigInteger)
+    else:
+        cohort = func.strftime("%Y-%m", e.created_at)
+        epoch = lambda column: cast(func.strftime("%s", column), BigInteger)
+
+    timed = e.created_at.isnot(None) & e.completed_at.isnot(None)
+    cohort = func.coalesce(cohort, literal(UNKNOWN_COHORT)).label("cohort")
+    return (
+        select(
+            e.manager_id.label("manager_id"),
+            cohort,
+            e.status.label("status"),
+            func.count().label("evaluations"),
+            func.coalesce(func.sum(e.rating + func.coalesce(e.hr_rating_adjustment, 0)), 0).label("rating_total"),
+            func.coalesce(func.sum(case((timed, epoch(e.completed_at) - epoch(e.created_at)), else_=0)), 0)
+            .label("completion_seconds"),
+            func.coalesce(func.sum(case((timed, 1), else_=0)), 0).label("timed_completions"),
+        )
+        .group_by(e.manager_id, cohort, e.status)
+    )
+
+
+def rebuild(conn):
+    if conn.dialect.name == "postgresql":
+        # Writers block on their upsert until the rebuild commits, then apply on top of it
+        conn.execute(text(f"LOCK TABLE {stats_table.name} IN EXCLUSIVE MODE"))
+    conn.execute(delete(stats_table))
+    conn.execute(insert(stats_table).from_select(
+        KEY_COLUMNS + VALUE_COLUMNS, _brute_force_select(conn.dialect.name)
+    ))
+
+
+def summary_queries(source=stats_table):
+    # Per-manager and per-cohort totals by status; source can also be
+    # _brute_force_select(...).subquery() to get the same numbers from evaluations
+    return [
+        select(
+            source.c[column].label("key"),
+            source.c.status,
+            # Postgres sums bigints as numeric; keep them ints
+            *[cast(func.sum(source.c[c]), BigInteger).label(c) for c in VALUE_COLUMNS],
+        ).group_by(source.c[column], source.c.status)
+        for column in ("manager_id", "cohort")
+    ]
+
+
+def _empty_group():
+    return {"evaluations": 0, "funnel": dict.fromkeys(STATUSES, 0), "_rating": 0, "_seconds": 0, "_timed": 0}
+
+
+def _add(group, row):
+    group["evaluations"] += row.evaluations
+    group["funnel"][row.status] = group["funnel"].get(row.status, 0) + row.evaluations
+    if row.status == "completed":
+        group["_rating"] += row.rating_total
+        group["_seconds"] += row.completion_seconds
+        group["_timed"] += row.timed_completions
+
+
+def _finish(group):
+    # Averages are over completed evaluations, whose final rating is settled
+    completed = group["funnel"]["completed"]
+    rating = group.pop("_rating")
+    seconds = group.pop("_seconds")
+    timed = group.pop("_timed")
+    group["average_final_rating"] = round(rating / completed, 2) if completed else None
+    group["average_days_to_complete"] = round(seconds / timed / 86400, 2) if timed else None
+    return group
+
+
+def summarize(manager_rows, cohort_rows):
+    overall = _empty_group()
+    managers = {}
+    cohorts = {}
+    for row in manager_rows:
+        if row.evaluations:
+            _add(managers.setdefault(row.key, _empty_group()), row)
+    for row in cohort_rows:
+        if row.evaluations:
+            _add(cohorts.setdefault(row.key, _empty_group()), row)
+            _add(overall, row)
+
+    return {
+        **_finish(overall),
+        "by_manager": [{"manager_id": k, **_finish(managers[k])} for k in sorted(managers)],
+        "by_cohort": [{"cohort": k, **_finish(cohorts[k])} for k in sorted(cohorts)],
+    }
+
+
+async def load_summary(db):
+    return summarize(*[(await db.execute(query)).all() for query in summary_queries()])
+
+
+def check(conn):
+    # Differences between evaluation_stats and a recomputation from evaluations
+    def keyed(rows):
+        return {
+            tuple(getattr(r, c) for c in KEY_COLUMNS): tuple(getattr(r, c) for c in VALUE_COLUMNS)
+            for r in rows
+            if r.evaluations
+        }
+
+    stored = keyed(conn.execute(select(stats_table)).all())
+    expected = keyed(conn.execute(_brute_force_select(conn.dialect.name)).all())
+    return [
+        (key, stored.get(key), expected.get(key))
+        for key in sorted(stored.keys() | expected.keys())
+        if stored.get(key) != expected.get(key)
+    ]
+
+
+if __name__ == "__main__":
+    import sys
+    from .database import engine
+
+    if "--rebuild" in sys.argv:
+        with engine.begin() as conn:
+            rebuild(conn)
+            groups = conn.execute(select(func.count()).select_from(stats_table)).scalar()
+        print(f"✅ Rebuilt {stats_table.name}: {groups} groups")
+    elif "--check" in sys.argv:
+        with engine.connect() as conn:
+            mismatches = check(conn)
+        for key, stored, expected in mismatches:
+            print(f"❌ {key}: stored={stored} expected={expected}")
+        if mismatches:
+            print(f"{len(mismatches)} groups differ; run --rebuild to repair")
+            sys.exit(1)
+        print(f"✅ {stats_table.name} matches evaluations")
+    else:
+        print("Usage: python -m backend.analytics --rebuild | --check")
+        sys.exit(1)
@@ -1,27 +1,55 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import os
-from dotenv import load_dotenv
-from pathlib import Path
-
-# Get absolute path to backend directory
-BASE_DIR = Path(__file__).resolve().parent
-env_path = BASE_DIR / ".env"
-
-# Load .env explicitly
-load_dotenv(dotenv_path=env_path)
+from sqlalchemy import select, update
+from . import database
+from .database import AsyncSessionLocal
+from .executors import LazyExecutor, pool_kind
+from .migrations import ensure_schema, schema_ready
+from . import metrics
+from . import models
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+# Verified token claims kept in memory until the token's exp
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+# Active flag and role per user; toggle_user invalidates locally, other workers
+# notice the bumped auth_state.users_version within AUTH_VERSION_CHECK_SECONDS
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "4096"))
+AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "300"))
+AUTH_VERSION_CHECK_SECONDS = float(os.getenv("AUTH_VERSION_CHECK_SECONDS", "2"))
+
 if not SECRET_KEY:
     raise RuntimeError("SECRET_KEY not set in environment variables")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost factor. Hashes at any other cost still verify, and are re-hashed at this
+# cost on the user's next successful login (passlib needs_update via min/max rounds).
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Hashing runs on its own bounded pool so a login burst can't starve the threadpool
+# the rest of the app uses (see executors.py):
+#   process - one process per core, bcrypt scales across cores (default)
+#   thread  - for runtimes without multiprocessing support (default on Vercel)
+PASSWORD_HASH_POOL = pool_kind("PASSWORD_HASH_POOL")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 security = HTTPBearer()
 
@@ -34,6 +62,25 @@ def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password, hashed_password):
+    # (matches, new_hash); new_hash is set when the stored hash uses an outdated cost
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+_hash_executor = LazyExecutor(PASSWORD_HASH_POOL, PASSWORD_HASH_WORKERS, "bcrypt", "Password hash")
+
+
+async def run_password_job(fn, *args):
+    # fn must be a module-level function here so it can be sent to a worker process
+    loop = asyncio.get_running_loop()
+    with metrics.timed(metrics.PASSWORD_SECONDS, fn.__name__, span="bcrypt"):
+        return await loop.run_in_executor(_hash_executor.get(), fn, *args)
+
+
+def shutdown_password_pool():
+    _hash_executor.shutdown()
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -41,26 +88,152 @@ def create_access_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(
+class TokenCache:
+    # Bounded LRU of verified claims keyed by sha256(token), so a repeat request skips
+    # the HMAC check and JSON parse. Only touched from the event loop thread.
+
+    def __init__(self, max_entries=AUTH_TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # digest -> (exp, claims)
+
+    def get(self, token):
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        exp, claims = entry
+        if exp <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def set(self, token, claims):
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        self._entries[key] = (claims.get("exp", 0), claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class UserStatusCache:
+    # email -> (is_active, role) from the users table.
+    # auth_state.users_version is bumped in the same transaction as every status change;
+    # each worker polls it at most every check_seconds and drops its entries when it moves.
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        max_entries=AUTH_USER_CACHE_SIZE,
+        ttl_seconds=AUTH_USER_CACHE_TTL_SECONDS,
+        check_seconds=AUTH_VERSION_CHECK_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.check_seconds = check_seconds
+        self._entries = OrderedDict()  # email -> (expires_at, is_active, role)
+        self._version = None
+        self._next_check = 0.0
+
+    async def get(self, email):
+        # Returns (is_active, role), or None if there is no such user
+        now = time.monotonic()
+        check_version = now >= self._next_check
+        entry = self._entries.get(email)
+        if not check_version and entry is not None and entry[0] > now:
+            self._entries.move_to_end(email)
+            return entry[1], entry[2]
+
+        async with self.session_factory() as db:
+            if check_version:
+                self._next_check = now + self.check_seconds
+                await self._check_version(db)
+                entry = self._entries.get(email)
+                if entry is not None and entry[0] > now:
+                    return entry[1], entry[2]
+            return await self._load(db, email, now)
+
+    async def _check_version(self, db):
+        version = (await db.execute(
+            select(models.AuthState.users_version).filter(models.AuthState.id == 1)
+        )).scalar()
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    async def _load(self, db, email, now):
+        row = (await db.execute(
+            select(models.User.is_active, models.User.role).filter(models.User.email == email)
+        )).first()
+        if row is None:
+            return None
+        self._entries[email] = (now + self.ttl_seconds, bool(row.is_active), row.role)
+        self._entries.move_to_end(email)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return bool(row.is_active), row.role
+
+    def invalidate(self, email=None):
+        if email is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(email, None)
+
+
+token_claims = TokenCache()
+user_status = UserStatusCache()
+
+
+async def bump_user_version(db):
+    # Call inside the transaction that changes a user's active flag or role
+    await db.execute(
+        update(models.AuthState)
+        .filter(models.AuthState.id == 1)
+        .values(users_version=models.AuthState.users_version + 1)
+    )
+
+
+def decode_token(token):
+    claims = token_claims.get(token)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_claims.set(token, claims)
+    return claims
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        role: str = payload.get("role")
+        payload = decode_token(credentials.credentials)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
 
-        if email is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
+    email: str = payload.get("sub")
+    if email is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
 
-        return {"email": email, "role": role}
+    # Auth runs before get_db, so a cold serverless start may get here first
+    if not schema_ready():
+        await run_in_threadpool(ensure_schema, database.engine)
 
-    except JWTError:
+    status = await user_status.get(email)
+    if status is None:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    is_active, role = status
+    if not is_active:
+        raise HTTPException(status_code=403, detail="Account is deactivated. Contact HR.")
+
+    return {"email": email, "role": role}
+
 
 def require_role(required_role: str):
-    def role_checker(user: dict = Depends(get_current_user)):
+    async def role_checker(user: dict = Depends(get_current_user)):
         if user["role"] != required_role:
             raise HTTPException(status_code=403, detail="Access forbidden")
         return user
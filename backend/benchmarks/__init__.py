@@ -0,0 +1 @@
+# Benchmark scripts. Run from the project root, e.g. python -m backend.benchmarks.bench_get_db
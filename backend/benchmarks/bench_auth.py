@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# Per-request cost of get_current_user:
+#   decode only      - the old dependency: HS256 verify + parse, no is_active check
+#   decode + lookup  - the same plus a users query on every request (naive is_active check)
+#   cached           - auth.py as shipped: token claims and user status from memory
+#
+#   python -m backend.benchmarks.bench_auth --requests 20000
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--url", default="sqlite:///./bench_auth.db")
+parser.add_argument("--requests", type=int, default=20000)
+parser.add_argument("--users", type=int, default=200)
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.url
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+from sqlalchemy import select
+from backend import auth, models
+from backend.database import engine, async_engine, AsyncSessionLocal
+from backend.migrations import ensure_schema
+from backend.benchmarks.seed import ensure_user
+
+
+async def decode_only(credentials):
+    payload = jwt.decode(credentials.credentials, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+    return {"email": payload["sub"], "role": payload["role"]}
+
+
+async def decode_and_lookup(credentials):
+    payload = jwt.decode(credentials.credentials, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(models.User.is_active, models.User.role).filter(models.User.email == payload["sub"])
+        )).first()
+    if row is None or not row.is_active:
+        raise HTTPException(status_code=403)
+    return {"email": payload["sub"], "role": row.role}
+
+
+async def measure(fn, tokens):
+    # Warm-up pass also fills the caches for the cached variant
+    for credentials in tokens:
+        await fn(credentials)
+    samples = []
+    for i in range(args.requests):
+        credentials = tokens[i % len(tokens)]
+        start = time.perf_counter()
+        await fn(credentials)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+async def main():
+    ensure_schema(engine)
+    emails = [f"bench.auth{i}@algo8.ai" for i in range(args.users)]
+    for email in emails:
+        ensure_user(engine, email, "manager")
+    tokens = [
+        HTTPAuthorizationCredentials(
+            scheme="Bearer", credentials=auth.create_access_token({"sub": email, "role": "manager"})
+        )
+        for email in emails
+    ]
+
+    print(f"{args.requests:,} authenticated requests across {args.users} users\n")
+    for name, fn in (
+        ("decode only", decode_only),
+        ("decode + lookup", decode_and_lookup),
+        ("cached", auth.get_current_user),
+    ):
+        mean, p50, p99 = await measure(fn, tokens)
+        print(f"{name:16} mean={mean:8.1f}us  p50={p50:8.1f}us  p99={p99:8.1f}us")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+# Throughput of POST /hr/generate-reports against a fake Gemini model with fixed latency.
+# The report cache is disabled so every row is a real (fake) model call. Then two
+# overlapping requests over fresh rows: a row claimed by one is skipped by the other, so
+# no report is generated twice, and the rows past the limit are reported as truncated.
+# Requires httpx (pip install httpx).
+#
+#   python -m backend.benchmarks.bench_bulk_reports --rows 300 --latency-ms 800 --rpm 600 --concurrency 8
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--url", default="sqlite:///./bench_bulk_reports.db")
+parser.add_argument("--rows", type=int, default=200)
+parser.add_argument("--latency-ms", type=int, default=500)
+parser.add_argument("--rpm", type=float, default=600, help="token bucket rate; 0 disables limiting")
+parser.add_argument("--burst", type=float, default=5)
+parser.add_argument("--concurrency", type=int, default=8)
+parser.add_argument("--commit-batch", type=int, default=25)
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.url
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["GEMINI_REQUESTS_PER_MINUTE"] = str(args.rpm)
+os.environ["GEMINI_BURST"] = str(args.burst)
+os.environ["BULK_REPORT_CONCURRENCY"] = str(args.concurrency)
+os.environ["BULK_REPORT_COMMIT_BATCH"] = str(args.commit_batch)
+
+import httpx
+from backend import ai_service, models
+from backend.auth import create_access_token
+from backend.database import engine, SessionLocal
+from backend.main import app
+from backend.migrations import ensure_schema
+from backend.benchmarks.fakes import FakeGenerativeModel
+from backend.benchmarks.seed import ensure_user
+
+
+def seed():
+    ensure_schema(engine)
+    ensure_user(engine, "bench.hr@algo8.ai", "hr")
+    db = SessionLocal()
+    try:
+        db.query(models.Evaluation).filter(models.Evaluation.manager_id == "bench.bulk@algo8.ai").delete()
+        db.add_all([
+            models.Evaluation(
+                intern_id=f"intern{i}@algo8.ai",
+                rating=1 + i % 5,
+                manager_comment=f"Evaluation {i}: delivered the sprint goals.",
+                manager_id="bench.bulk@algo8.ai",
+                months_worked=6,
+                intern_comment="Thanks for the feedback.",
+                hr_comment="Reviewed.",
+                hr_rating_adjustment=0,
+                status="completed",
+            )
+            for i in range(args.rows)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def main():
+    seed()
+    model = FakeGenerativeModel(latency_ms=args.latency_ms)
+    ai_service.set_model(model, model_name="fake-bench")
+    ai_service.set_report_cache(None)
+
+    token = create_access_token({"sub": "bench.hr@algo8.ai", "role": "hr"})
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        response = await client.post(
+            "/hr/generate-reports",
+            json={"manager_id": "bench.bulk@algo8.ai", "limit": args.rows},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        elapsed = time.perf_counter() - started
+
+    summary = json.loads(response.text.strip().splitlines()[-1])
+    per_minute = summary["generated"] / elapsed * 60
+    print(
+        f"rows={args.rows} latency={args.latency_ms}ms rpm_limit={args.rpm} concurrency={args.concurrency}\n"
+        f"generated={summary['generated']} failed={summary['failed']} committed={summary['committed']} "
+        f"in {elapsed:.1f}s -> {per_minute:.0f} reports/min (model calls: {model.calls})"
+    )
+    serial = 60000 / args.latency_ms
+    print(f"serial one-request-per-row ceiling at this latency: {serial:.0f} reports/min")
+
+    seed()
+    calls = model.calls
+    limit = args.rows * 3 // 4
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        responses = await asyncio.gather(*(
+            client.post(
+                "/hr/generate-reports",
+                json={"manager_id": "bench.bulk@algo8.ai", "limit": limit},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            for _ in range(2)
+        ))
+    summaries = [json.loads(r.text.strip().splitlines()[-1]) for r in responses]
+    generated = sum(s["generated"] for s in summaries)
+    print(
+        f"\n2 overlapping requests with limit={limit}: generated {[s['generated'] for s in summaries]}, "
+        f"skipped {[s['skipped'] for s in summaries]}, truncated {[s['truncated'] for s in summaries]}, "
+        f"model calls {model.calls - calls}"
+    )
+    assert model.calls - calls == generated <= args.rows
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+import argparse
+import os
+import statistics
+import time
+
+# What a dashboard page costs with each way of producing its total:
+#   count + page     - the old two-query approach (and a count-cache miss)
+#   window           - count(*) OVER () in the page query (measured, not used)
+#   has_more only    - include_total=false: a single limit+1 fetch
+#   cached count     - include_total=true with a count-cache hit
+# WARNING: drops and re-seeds the evaluations table. Point it at a scratch database.
+#
+#   python -m backend.benchmarks.bench_counts --sizes 100000,1000000
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--url", default="sqlite:///./bench_counts.db")
+parser.add_argument("--sizes", default="100000")
+parser.add_argument("--repeat", type=int, default=20)
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.url
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import func, select
+from backend.database import engine
+from backend.count_cache import CountCache
+from backend.migrations import ensure_schema
+from backend.queries import DASHBOARD_ORDER, manager_evaluations_query, hr_evaluations_query
+from backend.benchmarks.seed import seed_evaluations
+
+PAGE_SIZE = 50
+
+
+def timed(fn):
+    samples = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def strategies(conn, query):
+    page = query.order_by(*DASHBOARD_ORDER).limit(PAGE_SIZE + 1)
+    windowed = query.order_by(*DASHBOARD_ORDER).add_columns(func.count().over()).limit(PAGE_SIZE + 1)
+    count = select(func.count()).select_from(query.subquery())
+    cache = CountCache(ttl_seconds=60)
+    cache.set(("bench",), conn.execute(count).scalar_one())
+
+    def cached():
+        conn.execute(page).all()
+        cache.get(("bench",))
+
+    return {
+        "count + page": lambda: (conn.execute(count).scalar_one(), conn.execute(page).all()),
+        "window": lambda: conn.execute(windowed).all(),
+        "has_more only": lambda: conn.execute(page).all(),
+        "cached count": cached,
+    }
+
+
+if __name__ == "__main__":
+    ensure_schema(engine)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        seed_evaluations(engine, size)
+        print(f"\n{size:,} evaluations")
+        with engine.connect() as conn:
+            for name, query in (
+                ("manager", manager_evaluations_query("manager3@algo8.ai")),
+                ("hr default", hr_evaluations_query()),
+            ):
+                results = {label: timed(fn) for label, fn in strategies(conn, query).items()}
+                baseline = results["count + page"]
+                line = "  ".join(
+                    f"{label}={ms:.2f}ms ({(1 - ms / baseline) * 100:+.0f}%)" if label != "count + page" else f"{label}={ms:.2f}ms"
+                    for label, ms in results.items()
+                )
+                print(f"  {name:11} {line}")
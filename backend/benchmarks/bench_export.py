@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+# GET /hr/evaluations/export over a large table: MB/s and peak RSS of the serving
+# process, streamed (yield_per partitions) against buffering every row first.
+# Each export runs in a fresh interpreter so its peak RSS is its own.
+# WARNING: drops and re-seeds the evaluations table. Point it at a scratch database.
+#
+#   python -m backend.benchmarks.bench_export --sizes 100000,1000000
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--url", default="sqlite:///./bench_export.db")
+parser.add_argument("--sizes", default="100000,1000000")
+parser.add_argument("--formats", default="csv,ndjson")
+parser.add_argument("--modes", default="stream,buffered")
+parser.add_argument("--run", help=argparse.SUPPRESS)  # "format,mode": measure one export
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.url
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+HR_EMAIL = "bench.export@algo8.ai"
+
+
+async def export(export_format, mode):
+    from backend import exports
+    from backend.auth import create_access_token
+    from backend.database import AsyncSessionLocal
+    from backend.main import app
+
+    if mode == "buffered":
+        # What a non-streaming endpoint would do: fetch everything, then write it out
+        async def buffered(query, export_format="csv", **kwargs):
+            names = [column.name for column in exports.EXPORT_COLUMNS]
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(query)).all()
+            if export_format == "csv":
+                yield exports._csv_chunk(names, rows, header=True).encode("utf-8")
+            else:
+                yield exports._ndjson_chunk(names, rows).encode("utf-8")
+
+        import backend.main
+        backend.main.stream_export = buffered
+
+    # Drive the ASGI app directly: httpx's ASGITransport collects the whole body in memory,
+    # which would hide whether the server streams
+    token = create_access_token({"sub": HR_EMAIL, "role": "hr"})
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/hr/evaluations/export",
+        "raw_path": b"/hr/evaluations/export",
+        "root_path": "",
+        "query_string": f"format={export_format}".encode(),
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    received = 0
+    status = None
+    requested = False
+
+    async def receive():
+        # The request body once, then block like a server waiting for a disconnect
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal received, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    if status != 200:
+        raise SystemExit(f"export returned {status}")
+    print(f"{received} {time.perf_counter() - started}")
+
+
+def run_one(export_format, mode):
+    command = [sys.executable, "-m", "backend.benchmarks.bench_export", "--url", args.url, "--run", f"{export_format},{mode}"]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    output = process.stdout.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise SystemExit(f"export failed ({export_format}, {mode})")
+    received, elapsed = output.strip().splitlines()[-1].split()
+    return int(received), float(elapsed), usage.ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    if args.run:
+        export_format, mode = args.run.split(",")
+        asyncio.run(export(export_format, mode))
+        sys.exit(0)
+
+    from backend.database import engine
+    from backend.migrations import ensure_schema
+    from backend.benchmarks.seed import seed_evaluations, ensure_user
+
+    ensure_schema(engine)
+    ensure_user(engine, HR_EMAIL, "hr")
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}\n")
+    for size in (int(s) for s in args.sizes.split(",")):
+        seed_evaluations(engine, size)
+        for export_format in args.formats.split(","):
+            for mode in args.modes.split(","):
+                received, elapsed, rss_mb = run_one(export_format, mode)
+                print(
+                    f"{size:>9,} rows  {export_format:6} {mode:8}  {received / 1e6:8.1f}MB in {elapsed:6.1f}s "
+                    f"= {received / 1e6 / elapsed:6.1f}MB/s  peak RSS={rss_mb:7.1f}MB"
+                )
@@ -0,0 +1,89 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+# Cold start of the Vercel entry point: `python -X importtime -c "import api.index"` in a
+# fresh interpreter, repeated, with the slowest modules listed. Exits 1 when the median
+# import time is over --budget-ms, or when a module that should only load on first use
+# (Gemini client, database drivers) is imported eagerly again. Run it in CI or before a
+# deploy; the budget is machine dependent, the lazy-module check is not.
+#
+#   python -m backend.benchmarks.bench_import_time --budget-ms 1500
+#   python -m backend.benchmarks.bench_import_time --runs 10 --top 25
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--module", default="api.index")
+parser.add_argument("--runs", type=int, default=5)
+parser.add_argument("--budget-ms", type=float, default=1500.0)
+parser.add_argument("--top", type=int, default=15)
+args = parser.parse_args()
+
+# Loaded on first use (ai_service.get_model, database engines); never at import
+LAZY_MODULES = ["google.generativeai", "grpc", "asyncpg", "psycopg2", "aiosqlite", "fpdf"]
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def import_once():
+    env = {**os.environ, "PYTHONPATH": ROOT, "SECRET_KEY": os.getenv("SECRET_KEY", "import-time")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"❌ import {args.module} failed:\n{result.stderr[-2000:]}")
+
+    # (self us, cumulative us) per module; the top-level module's cumulative is the total
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = (int(self_us), int(cumulative_us))
+        if len(indent) == 1:
+            total += int(cumulative_us)
+    return total, modules
+
+
+def main():
+    import_once()  # compile .pyc files so every measured run is a warm-cache cold start
+    totals = []
+    cumulative = defaultdict(list)
+    for _ in range(args.runs):
+        total, modules = import_once()
+        totals.append(total / 1000)
+        for name, (_, cumulative_us) in modules.items():
+            cumulative[name].append(cumulative_us / 1000)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.0f}ms, min {min(totals):.0f}ms, max {max(totals):.0f}ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.0f}ms)\n")
+
+    # Packages and backend modules only, so one slow package isn't listed once per submodule
+    tops = {name: statistics.median(times) for name, times in cumulative.items()
+            if "." not in name or name.startswith("backend.")}
+    for name, ms in sorted(tops.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {ms:8.1f}ms  {name}")
+
+    eager = [name for name in LAZY_MODULES if name in cumulative]
+    failed = False
+    if eager:
+        print(f"\n❌ Imported at startup, should load on first use: {', '.join(eager)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"\n❌ Over budget by {median - args.budget_ms:.0f}ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\n✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+# Login throughput at each bcrypt cost, with hashing on the thread pool and on the
+# process pool. Each (cost, pool) runs in a fresh interpreter because BCRYPT_ROUNDS and
+# PASSWORD_HASH_POOL are read at import time. Requires httpx (pip install httpx).
+#
+#   python -m backend.benchmarks.bench_login --costs 10,11,12,13 --logins 64
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--url", default="sqlite:///./bench_login.db")
+parser.add_argument("--costs", default="10,11,12,13")
+parser.add_argument("--pools", default="thread,process")
+parser.add_argument("--logins", type=int, default=64)
+parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+parser.add_argument("--run", help=argparse.SUPPRESS)  # "cost,pool": measure one combination
+args = parser.parse_args()
+
+USERS = 16
+PASSWORD = "correct horse battery staple"
+
+
+async def measure():
+    import httpx
+    from sqlalchemy import delete, insert
+    from backend import auth, models
+    from backend.database import engine
+    from backend.main import app
+    from backend.migrations import ensure_schema
+
+    ensure_schema(engine)
+    # Every user shares one hash at the configured cost, so no login triggers a rehash
+    hashed = auth.hash_password(PASSWORD)
+    emails = [f"bench.login{i}@algo8.ai" for i in range(USERS)]
+    with engine.begin() as conn:
+        conn.execute(delete(models.User).where(models.User.email.in_(emails)))
+        conn.execute(insert(models.User), [
+            {"name": email, "email": email, "password": hashed, "role": "intern", "is_active": 1}
+            for email in emails
+        ])
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def login(i):
+            response = await client.post("/login", json={"email": emails[i % USERS], "password": PASSWORD})
+            response.raise_for_status()
+
+        # Warm-up starts the pool's workers
+        await asyncio.gather(*(login(i) for i in range(args.workers)))
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.logins)))
+        elapsed = time.perf_counter() - started
+
+    auth.shutdown_password_pool()
+    cores = min(args.workers, os.cpu_count() or 1)
+    per_second = args.logins / elapsed
+    print(f"{per_second:.2f} {per_second / cores:.2f} {cores}")
+
+
+def run_one(cost, pool):
+    env = dict(
+        os.environ,
+        DATABASE_URL=args.url,
+        SECRET_KEY=os.environ.get("SECRET_KEY", "benchmark"),
+        BCRYPT_ROUNDS=str(cost),
+        PASSWORD_HASH_POOL=pool,
+        PASSWORD_HASH_WORKERS=str(args.workers),
+    )
+    command = [
+        sys.executable, "-m", "backend.benchmarks.bench_login",
+        "--run", f"{cost},{pool}", "--logins", str(args.logins), "--workers", str(args.workers),
+    ]
+    output = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+    per_second, per_core, cores = output.strip().splitlines()[-1].split()
+    return float(per_second), float(per_core), int(cores)
+
+
+if __name__ == "__main__":
+    if args.run:
+        asyncio.run(measure())
+        sys.exit(0)
+
+    print(f"{args.logins} concurrent logins per run, {args.workers} hash workers, {os.cpu_count()} cores\n")
+    for cost in (int(c) for c in args.costs.split(",")):
+        for pool in args.pools.split(","):
+            per_second, per_core, cores = run_one(cost, pool)
+            print(f"cost={cost:<3} pool={pool:8} {per_second:8.2f} logins/s  {per_core:8.2f} logins/s/core ({cores} cores)")
@@ -0,0 +1,74 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# migrate_to_postgres.py on a large SQLite database: wall time, rows/s and the peak
+# RSS of the migration process, per table size and load method. Flat RSS across sizes
+# is the point: rows are streamed in batches, never loaded whole.
+# WARNING: re-seeds the SQLite file and truncates users/evaluations in the target.
+#
+#   python -m backend.benchmarks.bench_pg_migration --postgres-url postgresql://postgres@localhost:5432/ims_bench --sizes 100000,1000000
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--postgres-url", required=True)
+parser.add_argument("--sqlite", default="./bench_pg_migration.db")
+parser.add_argument("--sizes", default="100000,1000000")
+parser.add_argument("--methods", default="copy,insert")
+parser.add_argument("--batch-size", type=int, default=5000)
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = f"sqlite:///{args.sqlite}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import create_engine, inspect, text
+from backend.database import engine
+from backend.migrations import ensure_schema
+from backend.benchmarks.seed import seed_evaluations
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def reset_target():
+    target = create_engine(args.postgres_url)
+    existing = set(inspect(target).get_table_names())
+    tables = [t for t in ("evaluations", "users", "evaluation_search", "sqlite_import_checkpoint") if t in existing]
+    if tables:
+        with target.begin() as conn:
+            conn.execute(text(f"TRUNCATE {', '.join(tables)}"))
+    target.dispose()
+
+
+def run_migration(method):
+    command = [
+        sys.executable, "migrate_to_postgres.py",
+        "--sqlite", os.path.abspath(args.sqlite),
+        "--postgres-url", args.postgres_url,
+        "--method", method,
+        "--batch-size", str(args.batch_size),
+        "--restart",
+    ]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    output = process.stdout.read()
+    # wait4 gives this child's own rusage, so each run's peak RSS is measured separately
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - started
+    if os.waitstatus_to_exitcode(status) != 0:
+        print(output)
+        raise SystemExit(f"migration failed ({method})")
+    line = next(l for l in output.splitlines() if "evaluations:" in l and "rows in" in l)
+    return elapsed, usage.ru_maxrss / 1024, line.split("✅ ")[-1]
+
+
+if __name__ == "__main__":
+    ensure_schema(engine)
+    print(f"Target: {args.postgres_url.split('@')[-1]}  batch size {args.batch_size}\n")
+    for size in (int(s) for s in args.sizes.split(",")):
+        seed_evaluations(engine, size)
+        source_mb = os.path.getsize(args.sqlite) / 1024 / 1024
+        for method in args.methods.split(","):
+            reset_target()
+            elapsed, rss_mb, rate = run_migration(method)
+            print(f"{size:>9,} rows  {method:6}  wall={elapsed:7.1f}s  peak RSS={rss_mb:6.1f}MB  source={source_mb:.0f}MB  {rate}")
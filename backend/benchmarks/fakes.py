@@ -0,0 +1,46 @@
+import random
+import time
+
+# Stand-ins for the Gemini client, used with ai_service.set_model().
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    # stream=True spreads latency_ms over `chunks` pieces, like Gemini's streaming API
+    # returning the report a few sentences at a time
+
+    def __init__(self, latency_ms=0, failure_rate=0.0, chunks=20, report_chars=None):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.chunks = chunks
+        self.report_chars = report_chars
+        self.calls = 0
+
+    def _report(self, prompt):
+        report = f"Executive summary\n\nGenerated from a {len(prompt)} character prompt."
+        if self.report_chars:
+            report = (report + " The intern showed steady growth across the review period.") * (self.report_chars // 60 + 1)
+            report = report[:self.report_chars]
+        return report
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        if stream:
+            return self._stream(prompt)
+        time.sleep(self.latency_ms / 1000)
+        if random.random() < self.failure_rate:
+            raise RuntimeError("Fake Gemini error")
+        return FakeResponse(self._report(prompt))
+
+    def _stream(self, prompt):
+        report = self._report(prompt)
+        size = -(-len(report) // self.chunks)
+        for start in range(0, len(report), size):
+            time.sleep(self.latency_ms / 1000 / self.chunks)
+            if random.random() < self.failure_rate / self.chunks:
+                raise RuntimeError("Fake Gemini error")
+            yield FakeResponse(report[start:start + size])
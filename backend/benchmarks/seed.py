@@ -0,0 +1,62 @@
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, text
+from backend import models
+
+# Synthetic evaluations for the table-size benchmarks.
+# Drops and recreates the evaluations table, so only point benchmarks at scratch databases.
+
+STATUSES = ["pending_intern"] * 2 + ["pending_hr"] * 2 + ["completed"] * 6
+
+
+def seed_evaluations(engine, size, chunk_size=10000, seed=42, comment=None, managers=None):
+    # comment: optional fn(rng) -> manager_comment, for benchmarks that search comment text
+    # managers: fixed manager count instead of one per 200 evaluations
+    table = models.Evaluation.__table__
+    table.drop(bind=engine, checkfirst=True)
+    table.create(bind=engine)
+
+    managers = managers or max(10, size // 200)
+    interns = max(10, size // 4)
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        chunk = []
+        for i in range(size):
+            row = {
+                "intern_id": f"intern{rng.randrange(interns)}@algo8.ai",
+                "manager_id": f"manager{rng.randrange(managers)}@algo8.ai",
+                "rating": rng.randint(1, 5),
+                "manager_comment": comment(rng) if comment else "Consistent delivery on assigned tasks.",
+                "months_worked": rng.randint(1, 12),
+                "status": rng.choice(STATUSES),
+                "created_at": start + timedelta(minutes=i),
+                "hr_rating_adjustment": None,
+                "completed_at": None,
+            }
+            if row["status"] == "completed":
+                # Derived from i so the rng sequence (and every other column) stays unchanged
+                row["hr_rating_adjustment"] = i % 5 - 2
+                row["completed_at"] = row["created_at"] + timedelta(days=1 + i % 30, seconds=i % 86400)
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                conn.execute(insert(table), chunk)
+                chunk = []
+        if chunk:
+            conn.execute(insert(table), chunk)
+
+    analyze(engine)
+
+
+def analyze(engine):
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE" if engine.dialect.name == "sqlite" else "ANALYZE evaluations"))
+
+
+def ensure_user(engine, email, role):
+    # Auth looks tokens up in the users table, so benchmark tokens need a real row
+    table = models.User.__table__
+    with engine.begin() as conn:
+        if conn.execute(select(table.c.id).where(table.c.email == email)).first() is None:
+            conn.execute(insert(table), {"name": email, "email": email, "password": "-", "role": role, "is_active": 1})
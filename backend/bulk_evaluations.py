@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+import os
+from pydantic import ValidationError
+
+# Input handling for POST /create-evaluations/bulk.
+# Rows arrive as a JSON array (or {"evaluations": [...]}), a text/csv body, or a CSV
+# file upload. Every row is validated on its own so one bad row is reported back
+# instead of failing the whole batch.
+
+BULK_CREATE_MAX_ROWS = int(os.getenv("BULK_CREATE_MAX_ROWS", "5000"))
+CSV_COLUMNS = ["intern_id", "rating", "manager_comment", "months_worked"]
+
+
+def evaluation_error(rating, months_worked):
+    # The rules /create-evaluation has always enforced
+    if rating < 1 or rating > 5:
+        return "Rating must be between 1 and 5"
+    if months_worked <= 0:
+        return "Months worked must be positive"
+    return None
+
+
+def _parse_csv(content):
+    # utf-8-sig drops the BOM Excel puts in front of the header
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    missing = [c for c in CSV_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV must have columns: {', '.join(CSV_COLUMNS)} (missing {', '.join(missing)})")
+    return [{c: row[c] for c in CSV_COLUMNS} for row in reader]
+
+
+async def read_rows(request):
+    # Raises ValueError with a client-facing message
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise ValueError("Upload the CSV as a 'file' form field")
+        return _parse_csv(await upload.read())
+    if content_type.startswith("text/csv"):
+        return _parse_csv(await request.body())
+
+    try:
+        payload = json.loads(await request.body())
+    except json.JSONDecodeError:
+        raise ValueError("Body must be a JSON array of evaluations or a CSV upload")
+    if isinstance(payload, dict):
+        payload = payload.get("evaluations")
+    if not isinstance(payload, list):
+        raise ValueError("Body must be a JSON array of evaluations or a CSV upload")
+    return payload
+
+
+def validate_rows(items, row_model):
+    # Returns ([(row_number, row)], [{"row": n, "error": msg}]); rows are numbered from 1
+    valid, errors = [], []
+    for number, item in enumerate(items, start=1):
+        try:
+            row = row_model.model_validate(item)
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+            )
+            errors.append({"row": number, "error": message})
+            continue
+        error = evaluation_error(row.rating, row.months_worked)
+        if error:
+            errors.append({"row": number, "error": error})
+        else:
+            valid.append((number, row))
+    return valid, errors
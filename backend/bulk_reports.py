@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+import anyio
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, update
+from .database import AsyncSessionLocal
+from . import ai_service
+from . import models
+from .etags import EVALUATIONS, bump_version
+
+# Bulk AI report generation for POST /hr/generate-reports.
+# Rows are claimed first (report_status -> running in one conditional UPDATE), so two
+# overlapping requests or a background job never generate the same report twice.
+# Reports are produced by a bounded pool of tasks (each Gemini call also waits on the
+# shared token bucket in rate_limit.py), written back in batched commits, and progress
+# is streamed to the client as NDJSON. Failed rows are marked failed; rows a dropped
+# client left unfinished are released for the next run.
+
+BULK_REPORT_CONCURRENCY = int(os.getenv("BULK_REPORT_CONCURRENCY", "4"))
+BULK_REPORT_COMMIT_BATCH = int(os.getenv("BULK_REPORT_COMMIT_BATCH", "25"))
+
+
+async def claim(db, evaluation_ids):
+    # Returns the ids this call won; anything another request or job holds is left alone
+    if not evaluation_ids:
+        return []
+    claimed = (await db.execute(
+        update(models.Evaluation)
+        .where(
+            models.Evaluation.id.in_(evaluation_ids),
+            or_(models.Evaluation.report_status.is_(None), models.Evaluation.report_status == "failed"),
+            or_(models.Evaluation.report.is_(None), models.Evaluation.report == ""),
+        )
+        .values(report_status="running")
+        .returning(models.Evaluation.id)
+        .execution_options(synchronize_session=False)
+    )).scalars().all()
+    if claimed:
+        await bump_version(db, EVALUATIONS)
+    await db.commit()
+    return sorted(claimed)
+
+
+async def _release(session_factory, evaluation_ids):
+    async with session_factory() as db:
+        await db.execute(
+            update(models.Evaluation)
+            .where(models.Evaluation.id.in_(evaluation_ids), models.Evaluation.report_status == "running")
+            .values(report_status=None)
+            .execution_options(synchronize_session=False)
+        )
+        await bump_version(db, EVALUATIONS)
+        await db.commit()
+
+
+async def _write_batch(session_factory, batch):
+    async with session_factory() as db:
+        # ORM bulk UPDATE by primary key: one executemany for the whole batch
+        await db.execute(update(models.Evaluation), batch)
+        await bump_version(db, EVALUATIONS)
+        await db.commit()
+    # Reports saved; failed rows only had their status written
+    return sum(1 for row in batch if "report" in row)
+
+
+async def stream_bulk_reports(
+    evaluations,
+    skipped=0,
+    truncated=0,
+    concurrency=BULK_REPORT_CONCURRENCY,
+    commit_batch=BULK_REPORT_COMMIT_BATCH,
+    session_factory=AsyncSessionLocal,
+):
+    total = len(evaluations)
+    semaphore = asyncio.Semaphore(concurrency)
+    results = asyncio.Queue()
+
+    async def produce(evaluation):
+        async with semaphore:
+            try:
+                report = await run_in_threadpool(ai_service.generate_evaluation_report, evaluation)
+                await results.put((evaluation.id, report, None))
+            except Exception as e:
+                await results.put((evaluation.id, None, str(e)))
+
+    tasks = [asyncio.create_task(produce(evaluation)) for evaluation in evaluations]
+    unfinished = {evaluation.id for evaluation in evaluations}
+    batch = []
+    generated = failed = committed = 0
+
+    try:
+        yield json.dumps({"event": "started", "total": total, "skipped": skipped, "truncated": truncated}) + "\n"
+
+        for _ in range(total):
+            evaluation_id, report, error = await results.get()
+            unfinished.discard(evaluation_id)
+            if error is None:
+                generated += 1
+                batch.append({"id": evaluation_id, "report": report, "report_status": "done"})
+            else:
+                failed += 1
+                batch.append({"id": evaluation_id, "report_status": "failed"})
+                print(f"AI Report Generation failed for evaluation {evaluation_id}: {error}")
+
+            if len(batch) >= commit_batch:
+                committed += await _write_batch(session_factory, batch)
+                batch = []
+
+            yield json.dumps({
+                "event": "progress",
+                "evaluation_id": evaluation_id,
+                "ok": error is None,
+                "error": error,
+                "generated": generated,
+                "failed": failed,
+                "committed": committed,
+                "total": total,
+            }) + "\n"
+
+        if batch:
+            committed += await _write_batch(session_factory, batch)
+            batch = []
+
+        yield json.dumps({
+            "event": "finished",
+            "generated": generated,
+            "failed": failed,
+            "committed": committed,
+            "skipped": skipped,
+            "truncated": truncated,
+            "total": total,
+        }) + "\n"
+    finally:
+        # Client went away: stop outstanding work, save what finished and hand the rest back.
+        # Shielded, since the disconnect cancels this generator's scope.
+        for task in tasks:
+            task.cancel()
+        with anyio.CancelScope(shield=True):
+            if batch:
+                await _write_batch(session_factory, batch)
+            if unfinished:
+                await _release(session_factory, list(unfinished))
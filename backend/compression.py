@@ -0,0 +1,169 @@
+import gzip
+import os
+import zlib
+import brotli
+
+# Response compression for the whole app.
+# Picks brotli or gzip from Accept-Encoding (server preference order from
+# RESPONSE_COMPRESSION) and leaves bodies under COMPRESSION_MINIMUM_SIZE alone.
+# Streamed bodies (exports, bulk report progress) are compressed chunk by chunk
+# with a flush after each one, so NDJSON progress lines still reach the client
+# as they are produced instead of sitting in the compressor.
+#   RESPONSE_COMPRESSION=br,gzip (default) | gzip | off
+
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "br,gzip")
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# 4-5 is the usual range for dynamic responses; 11 is for static assets
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+SUPPORTED_ENCODINGS = ("br", "gzip")
+# Already compressed formats (report PDFs, ZIP exports): recompressing only costs CPU
+INCOMPRESSIBLE_TYPES = (b"application/pdf", b"application/zip", b"image/")
+
+
+def enabled_encodings(setting=RESPONSE_COMPRESSION):
+    if setting.strip().lower() in ("", "off", "none", "0"):
+        return []
+    return [e.strip() for e in setting.split(",") if e.strip() in SUPPORTED_ENCODINGS]
+
+
+def choose_encoding(accept_encoding, encodings):
+    # First server-preferred encoding the client accepts with q > 0
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding, gzip_level, brotli_quality):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            # wbits 16+ writes the gzip header and trailer
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._brotli = None
+
+    def chunk(self, data):
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+def compress(encoding, data, gzip_level=GZIP_LEVEL, brotli_quality=BROTLI_QUALITY):
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        encodings=None,
+        minimum_size=COMPRESSION_MINIMUM_SIZE,
+        gzip_level=GZIP_LEVEL,
+        brotli_quality=BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.encodings = enabled_encodings() if encodings is None else encodings
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoding = choose_encoding(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                # Held back until the first body message says how big the response is
+                start = message
+                headers = {k.lower(): v for k, v in start.get("headers", [])}
+                passthrough = b"content-encoding" in headers or headers.get(
+                    b"content-type", b""
+                ).startswith(INCOMPRESSIBLE_TYPES)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if passthrough:
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start is not None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+
+                headers = [
+                    (k, v) for k, v in start.get("headers", [])
+                    if k.lower() not in (b"content-length", b"vary")
+                ]
+                vary = [v for k, v in start.get("headers", []) if k.lower() == b"vary"]
+                vary_value = b", ".join(vary + [b"Accept-Encoding"])
+                headers += [(b"content-encoding", encoding.encode("ascii")), (b"vary", vary_value)]
+
+                if not more_body:
+                    # Whole body in one message: compress it once and send a length
+                    compressed = compress(encoding, body, self.gzip_level, self.brotli_quality)
+                    headers.append((b"content-length", str(len(compressed)).encode("ascii")))
+                    await send({**start, "headers": headers})
+                    start = None
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                await send({**start, "headers": headers})
+                start = None
+
+            data = compressor.chunk(body) if body else b""
+            if not more_body:
+                data += compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,42 @@
+import os
+import time
+from collections import OrderedDict
+
+# Short-lived cache of listing totals, keyed by the listing's filters, e.g.
+# ("manager", email, search, status). Writes that can change a listing's membership
+# (create, status transitions) call invalidate(); the TTL bounds staleness from
+# writes made by other workers.
+
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "5"))
+COUNT_CACHE_SIZE = int(os.getenv("COUNT_CACHE_SIZE", "1024"))
+
+
+class CountCache:
+    # Only touched from the event loop thread, so no locking
+
+    def __init__(self, ttl_seconds=COUNT_CACHE_TTL_SECONDS, max_entries=COUNT_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, total = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return total
+
+    def set(self, key, total):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, total)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        self._entries.clear()
+
+
+evaluation_counts = CountCache()
@@ -1,34 +1,228 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool, AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 
+# The one place .env is loaded (backend/.env, or the nearest one above it). main imports
+# this module before anything else in backend/ reads settings at import time.
 load_dotenv()
 
 # Use Postgres URL if provided, otherwise fallback to local SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ims.db")
 
-# SQLite requires different connect_args than Postgres
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL, connect_args={"check_same_thread": False}
-    )
-else:
-    # Postgres configuration
+# Postgres connection strategy:
+#   queue      - bounded QueuePool for long-lived uvicorn workers
+#   serverless - one warm connection reused per container (default on Vercel)
+#   null       - fresh connection per request (old NullPool behaviour)
+DB_POOL_MODE = os.getenv("DB_POOL_MODE") or ("serverless" if os.getenv("VERCEL") else "queue")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Poolers (Supabase/PgBouncer) drop idle clients quickly, so warm serverless connections recycle sooner
+DB_SERVERLESS_RECYCLE = int(os.getenv("DB_SERVERLESS_RECYCLE", "300"))
+
+
+class _CheckoutWaitMetrics:
+    # Pool mixin that records how long checkouts wait for a free connection
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class MeteredQueuePool(_CheckoutWaitMetrics, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_CheckoutWaitMetrics, AsyncAdaptedQueuePool):
+    pass
+
+
+def normalize_url(url):
     # Vercel/Supabase URLs usually start with postgres:// but SQLAlchemy 1.4+ needs postgresql://
-    if DATABASE_URL.startswith("postgres://"):
-        DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
-    
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+
     # Robustly remove ?pgbouncer=true or &pgbouncer=true which causes issues with psycopg2 logic
-    if "pgbouncer=true" in DATABASE_URL:
-        DATABASE_URL = DATABASE_URL.replace("?pgbouncer=true", "").replace("&pgbouncer=true", "")
-        
-    # Use NullPool for Serverless (Vercel) to prevent intermittent connection errors
-    # This ensures a fresh connection for every request, avoiding stale pooling issues.
-    engine = create_engine(DATABASE_URL, poolclass=NullPool)
+    if "pgbouncer=true" in url:
+        url = url.replace("?pgbouncer=true", "").replace("&pgbouncer=true", "")
+
+    return url
+
+
+def async_url(url):
+    # Same database, async drivers: aiosqlite locally, asyncpg for Postgres
+    url = normalize_url(url)
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        url = url.replace("postgresql:", "postgresql+asyncpg:", 1)
+        # asyncpg takes ssl=..., not libpq's sslmode=...
+        return url.replace("sslmode=", "ssl=")
+    return url
+
+
+def _pool_kwargs(pool_mode, poolclass):
+    if pool_mode == "null":
+        return {"poolclass": NullPool}
+
+    if pool_mode == "serverless":
+        # Keep a single connection warm between invocations of the same container.
+        # Overflow stays small so a burst can't exhaust the pooler's client slots.
+        return dict(
+            poolclass=poolclass,
+            pool_size=1,
+            max_overflow=2,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_SERVERLESS_RECYCLE,
+            pool_pre_ping=True,
+        )
+
+    if pool_mode == "queue":
+        return dict(
+            poolclass=poolclass,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+
+    raise ValueError(f"Unknown DB_POOL_MODE: {pool_mode}")
+
+
+def build_engine(url, pool_mode=DB_POOL_MODE):
+    # SQLite requires different connect_args than Postgres
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+
+    return create_engine(normalize_url(url), **_pool_kwargs(pool_mode, MeteredQueuePool))
+
+
+def build_async_engine(url, pool_mode=DB_POOL_MODE):
+    if url.startswith("sqlite"):
+        # aiosqlite defaults to NullPool, which starts a new connection thread per request
+        return create_async_engine(async_url(url), poolclass=AsyncAdaptedQueuePool)
+
+    connect_args = {}
+    if "pgbouncer=true" in url:
+        # PgBouncer in transaction mode can't keep asyncpg's prepared statements
+        connect_args["statement_cache_size"] = 0
+
+    return create_async_engine(
+        async_url(url),
+        connect_args=connect_args,
+        **_pool_kwargs(pool_mode, MeteredAsyncQueuePool),
+    )
+
+
+# engine and async_engine are built on first use rather than at import: creating them
+# loads the database drivers, which a cold start that only answers a health check or a
+# CORS preflight never needs. `from .database import engine` still works (and builds it),
+# so scripts and benchmarks are unchanged; the app itself reads database.engine when needed.
+_engines_lock = threading.RLock()
+
+
+class _LazySessionmaker:
+    # Called like a sessionmaker; the engine behind it is built on the first call
+
+    def __init__(self, make):
+        self._make = make
+        self._sessionmaker = None
+
+    def __call__(self, **kwargs):
+        if self._sessionmaker is None:
+            with _engines_lock:
+                if self._sessionmaker is None:
+                    self._sessionmaker = self._make()
+        return self._sessionmaker(**kwargs)
+
+
+_ENGINE_BUILDERS = {
+    # Sync engine: migrations, scripts and benchmarks
+    "engine": lambda: build_engine(DATABASE_URL),
+    # Async engine: the API request path
+    "async_engine": lambda: build_async_engine(DATABASE_URL),
+}
+
+
+def _engine(name):
+    with _engines_lock:
+        if name not in globals():
+            globals()[name] = _ENGINE_BUILDERS[name]()
+    return globals()[name]
+
+
+def __getattr__(name):
+    if name in _ENGINE_BUILDERS:
+        return _engine(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def dialect_name(url=DATABASE_URL):
+    # Without building an engine
+    return make_url(normalize_url(url)).get_backend_name()
+
+
+async def dispose_async_engine():
+    # Nothing to close if this process never used the database
+    if "async_engine" in globals():
+        await globals()["async_engine"].dispose()
+
+
+SessionLocal = _LazySessionmaker(lambda: sessionmaker(autocommit=False, autoflush=False, bind=_engine("engine")))
+
+# expire_on_commit=False so returned ORM rows can be serialized after commit without lazy reloads
+AsyncSessionLocal = _LazySessionmaker(
+    lambda: async_sessionmaker(_engine("async_engine"), autoflush=False, expire_on_commit=False)
+)
+
+Base = declarative_base()
+
+
+def pool_metrics(target_engine=None):
+    pool = (target_engine or _engine("async_engine")).pool
+    metrics = {
+        "mode": "sqlite" if DATABASE_URL.startswith("sqlite") else DB_POOL_MODE,
+        "pool_class": type(pool).__name__,
+    }
+
+    if isinstance(pool, QueuePool):
+        metrics.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    if isinstance(pool, _CheckoutWaitMetrics):
+        with pool._metrics_lock:
+            checkouts = pool.checkouts
+            metrics.update({
+                "checkouts": checkouts,
+                "wait_seconds_total": round(pool.wait_seconds_total, 6),
+                "wait_seconds_max": round(pool.wait_seconds_max, 6),
+                "wait_seconds_avg": round(pool.wait_seconds_total / checkouts, 6) if checkouts else 0.0,
+            })
 
-Base = declarative_base()
\ No newline at end of file
+    return metrics
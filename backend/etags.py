@@ -0,0 +1,62 @@
+import hashlib
+from fastapi import Response
+from sqlalchemy import select, update
+from . import models
+
+# Conditional GETs for the dashboard reads.
+# data_versions keeps a counter per kind of data, bumped by every write inside its
+# transaction. A read's ETag hashes the counters it depends on together with the caller
+# and the request path and query, so repeating an unchanged listing costs one
+# primary-key lookup and a 304 instead of the listing queries and the JSON body.
+# Versions are read before the data: a write landing in between can only make the
+# ETag older than the body, which the next request then replaces.
+
+EVALUATIONS = "evaluations"
+USERS = "users"
+VERSION_NAMES = [EVALUATIONS, USERS]
+
+# Clients must revalidate on every use; the body is per user
+CACHE_CONTROL = "private, no-cache"
+
+
+async def bump_version(db, name):
+    await db.execute(
+        update(models.DataVersion)
+        .filter(models.DataVersion.name == name)
+        .values(version=models.DataVersion.version + 1)
+    )
+
+
+async def current_versions(db, *names):
+    rows = dict((await db.execute(
+        select(models.DataVersion.name, models.DataVersion.version).filter(models.DataVersion.name.in_(names))
+    )).all())
+    return tuple(rows.get(name, 0) for name in names)
+
+
+def make_etag(request, user, versions):
+    raw = f"{user['email']}|{user['role']}|{request.url.path}|{request.url.query}|{versions}"
+    # Weak: a compressed or re-encoded body is still the same representation
+    return 'W/"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    strip = lambda tag: tag.strip().removeprefix("W/")
+    return any(strip(tag) == strip(etag) for tag in header.split(","))
+
+
+async def conditional(request, response, db, user, *names):
+    # Returns (versions, 304 response or None); versions also key caches for this read
+    versions = await current_versions(db, *names)
+    etag = make_etag(request, user, versions)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return versions, Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return versions, None
@@ -0,0 +1,41 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Bounded pools for CPU-bound work (bcrypt in auth.py, PDF rendering in pdf_reports.py),
+# built on first use so importing the app never starts workers:
+#   process - one process per core, scales across cores (default)
+#   thread  - for runtimes without multiprocessing support (default on Vercel)
+# A process pool that can't be created falls back to threads.
+
+
+def pool_kind(setting):
+    return os.getenv(setting) or ("thread" if os.getenv("VERCEL") else "process")
+
+
+class LazyExecutor:
+    def __init__(self, kind, workers, name, description):
+        self.kind = kind
+        self.workers = workers
+        self.name = name  # thread name prefix
+        self.description = description  # for the fallback warning
+        self._executor = None
+
+    def get(self):
+        if self._executor is None:
+            if self.kind == "process":
+                try:
+                    # spawn, not fork: the parent already runs DB and worker threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                except (OSError, NotImplementedError) as e:
+                    print(f"⚠️ {self.description} process pool unavailable, using threads: {e}")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import os
+from .database import AsyncSessionLocal
+from . import models
+
+# Streaming exports for GET /hr/evaluations/export.
+# Rows come off a server-side cursor (yield_per) as plain column tuples, so no ORM
+# identity map builds up, and each partition is written out before the next is
+# fetched: memory stays at one partition however many rows match.
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+EXPORT_COLUMNS = [
+    models.Evaluation.id,
+    models.Evaluation.intern_id,
+    models.Evaluation.manager_id,
+    models.Evaluation.rating,
+    models.Evaluation.hr_rating_adjustment,
+    models.Evaluation.months_worked,
+    models.Evaluation.status,
+    models.Evaluation.manager_comment,
+    models.Evaluation.intern_comment,
+    models.Evaluation.hr_comment,
+    models.Evaluation.report_status,
+    models.Evaluation.report,
+    models.Evaluation.created_at,
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _format_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _csv_chunk(names, rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(names)
+    writer.writerows([_format_value(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(names, rows):
+    return "".join(
+        json.dumps(dict(zip(names, (_format_value(v) for v in row)))) + "\n" for row in rows
+    )
+
+
+async def stream_export(query, export_format="csv", batch_size=EXPORT_BATCH_SIZE, session_factory=AsyncSessionLocal):
+    # The request's session is closed before a StreamingResponse body runs, so use our own
+    names = [column.name for column in EXPORT_COLUMNS]
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        if export_format == "csv":
+            yield _csv_chunk(names, [], header=True).encode("utf-8")
+        async for rows in result.partitions():
+            if export_format == "csv":
+                yield _csv_chunk(names, rows).encode("utf-8")
+            else:
+                yield _ndjson_chunk(names, rows).encode("utf-8")
@@ -1,20 +1,52 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
-from .database import engine, SessionLocal
+from typing import List, Optional
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
+from datetime import datetime
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from sqlalchemy import select, func, or_, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import database
+from .database import DATABASE_URL, AsyncSessionLocal, dispose_async_engine, pool_metrics
 from . import models
-from dotenv import load_dotenv
+from .migrations import ensure_schema, schema_ready
 import os
-
-load_dotenv()
 from .auth import (
     hash_password,
-    verify_password,
+    verify_and_update_password,
+    run_password_job,
+    shutdown_password_pool,
     create_access_token,
     get_current_user,
-    require_role
+    require_role,
+    bump_user_version,
+    user_status
 )
+from . import ai_service
 from .ai_service import generate_evaluation_report
-from pydantic import BaseModel
+from .report_jobs import report_workers
+from .bulk_reports import claim, stream_bulk_reports
+from .report_stream import SSE_HEADERS, stream_report
+from .count_cache import evaluation_counts
+from .compression import CompressionMiddleware
+from . import metrics
+from .exports import EXPORT_COLUMNS, EXPORT_FORMATS, stream_export
+from .bulk_evaluations import BULK_CREATE_MAX_ROWS, evaluation_error, read_rows, validate_rows
+from . import analytics
+from .etags import EVALUATIONS, USERS, bump_version, conditional, etag_matches
+from .workflow import HR_REVIEW, HR_REVIEW_BATCH_MAX, INTERN_FEEDBACK, failures, hr_review_values, transition, transition_one
+from .pdf_reports import PDF_COLUMNS, content_hash, pdf_filename, report_pdfs, shutdown_render_pool, stream_reports_zip
+from .search import search_filter, order_by_relevance, sync_evaluations, sync_user
+from .queries import (
+    DASHBOARD_ORDER,
+    INTERN_VISIBLE_STATUSES,
+    LISTING_COLUMNS,
+    encode_cursor,
+    after_cursor,
+    manager_evaluations_query,
+    intern_evaluations_query,
+    hr_evaluations_query
+)
+from pydantic import BaseModel, ConfigDict
 from fastapi.middleware.cors import CORSMiddleware
 
 class LoginRequest(BaseModel):
@@ -43,14 +75,125 @@ class HRReviewRequest(BaseModel):
     comment: str
     rating_adjustment: int
 
-# Avoid creating tables at top-level to prevent startup crashes if DB is slow
-# models.Base.metadata.create_all(bind=engine)
+class HRReviewBatchRequest(BaseModel):
+    reviews: List[HRReviewRequest]
+
+class BulkReportRequest(BaseModel):
+    evaluation_ids: List[int] = None
+    search: str = None
+    manager_id: str = None
+    limit: int = 500
+
+# Response schemas: listings carry only what a dashboard card shows; never the password hash
+class EvaluationSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    intern_id: str
+    manager_id: str
+    rating: int
+    hr_rating_adjustment: Optional[int] = None
+    months_worked: int
+    status: Optional[str] = None
+    report_status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    manager_comment_preview: str
+    intern_comment_preview: Optional[str] = None
+    has_report: bool
+
+class EvaluationPage(BaseModel):
+    total: Optional[int] = None
+    evaluations: List[EvaluationSummary]
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+class EvaluationDetail(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    intern_id: str
+    manager_id: str
+    rating: int
+    hr_rating_adjustment: Optional[int] = None
+    months_worked: int
+    status: Optional[str] = None
+    manager_comment: str
+    intern_comment: Optional[str] = None
+    hr_comment: Optional[str] = None
+    report: Optional[str] = None
+    report_status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+class UserSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: Optional[str] = None
+    email: str
+    role: Optional[str] = None
+    is_active: Optional[int] = None
+
+class UserPage(BaseModel):
+    total: int
+    users: List[UserSummary]
+    has_more: bool
+
+USER_COLUMNS = [models.User.id, models.User.name, models.User.email, models.User.role, models.User.is_active]
 
-app = FastAPI(root_path="/api")
+# orjson encodes the listing pages several times faster than the stdlib encoder;
+# JSON_RESPONSES=json switches back (e.g. to compare)
+JSON_RESPONSES = os.getenv("JSON_RESPONSES", "orjson")
+
+app = FastAPI(
+    root_path="/api",
+    default_response_class=JSONResponse if JSON_RESPONSES == "json" else ORJSONResponse,
+)
+
+# Schema migrations run once per process instead of on every request.
+# A failure here is logged and retried by get_db, so a slow DB can't crash startup.
+@app.on_event("startup")
+def apply_schema_migrations():
+    ensure_schema(database.engine)
+
+@app.on_event("startup")
+async def start_report_workers():
+    try:
+        await report_workers.start()
+    except Exception as e:
+        print(f"⚠️ Report workers failed to start (will start on first enqueue): {e}")
+
+@app.on_event("shutdown")
+async def close_database_connections():
+    await report_workers.stop()
+    await dispose_async_engine()
+    shutdown_password_pool()
+    shutdown_render_pool()
 
 @app.get("/health")
-def health_check():
-    return {"status": "ok", "database": str(engine.url).split("@")[-1].split("/")[0]} # Masked DB host
+async def health_check():
+    return {"status": "ok", "database": DATABASE_URL.split("@")[-1].split("/")[0]} # Masked DB host
+
+@app.get("/health/pool")
+async def pool_health():
+    # Connection pool gauges (checked out, overflow, checkout wait) for scraping
+    return pool_metrics()
+
+@app.get("/metrics")
+async def prometheus_metrics(request: Request):
+    # Per-route latency, SQL per request, bcrypt and Gemini timings in Prometheus text format
+    if metrics.METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {metrics.METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/health/report-cache")
+async def report_cache_health():
+    # Hit/miss counters for the AI report cache
+    if ai_service.report_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **ai_service.report_cache.stats()}
+
 origins = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
@@ -62,29 +205,117 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read by the axios client for conditional GETs
+    expose_headers=["ETag"],
 )
 
+# brotli/gzip above COMPRESSION_MINIMUM_SIZE; see compression.py
+app.add_middleware(CompressionMiddleware)
+# Outermost, so request latency includes compression; see metrics.py
+app.add_middleware(metrics.MetricsMiddleware)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     print(f"🔥 GLOBAL ERROR: {exc}")
     return HTTPException(status_code=500, detail=str(exc))
 
-def get_db():
-    # Attempt to create tables on first request if they don't exist
-    try:
-        models.Base.metadata.create_all(bind=engine)
-    except Exception as e:
-        print(f"⚠️ Table creation failed (likely already exists or connecting): {e}")
-        
-    db = SessionLocal()
-    try:
+async def get_db():
+    # Migrations use the sync engine; only the first request on a runtime that skipped
+    # startup events (serverless) pays for them, everyone else sees the flag already set
+    if not schema_ready():
+        await run_in_threadpool(ensure_schema, database.engine)
+
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def count_evaluations(db: AsyncSession, query, count_key=None):
+    total = evaluation_counts.get(count_key) if count_key else None
+    if total is None:
+        total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar_one()
+        if count_key:
+            evaluation_counts.set(count_key, total)
+    return total
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    skip: int,
+    limit: int,
+    cursor: str = None,
+    include_total: bool = True,
+    count_key: tuple = None,
+    rank_by: str = None
+):
+    if limit < 1 or limit > 500:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 500")
+
+    if rank_by:
+        # Relevance order has no stable keyset, so ranked listings page by offset only
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursors are not supported with sort=relevance")
+        page_query = order_by_relevance(query, rank_by, *DASHBOARD_ORDER).offset(skip)
+    elif cursor:
+        # Keyset pagination; skip is ignored once a client sends a cursor
+        try:
+            page_query = after_cursor(query.order_by(*DASHBOARD_ORDER), cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    else:
+        page_query = query.order_by(*DASHBOARD_ORDER).offset(skip)
+
+    # One extra row tells us whether another page exists
+    rows = (await db.execute(page_query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    evaluations = rows[:limit]
+
+    total = None
+    if include_total:
+        if not cursor and not has_more and (evaluations or skip == 0):
+            # The whole tail of the listing is on this page, so no COUNT is needed
+            total = skip + len(evaluations)
+        else:
+            # COUNT(*) OVER () was measured slower than a separate count (it materializes
+            # every matching row), so totals come from a short-TTL per-filter cache instead
+            total = await count_evaluations(db, query, count_key)
+
+    next_cursor = None
+    if has_more and not rank_by:
+        last = evaluations[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return {
+        "total": total,
+        "evaluations": evaluations,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
+
+
+def relevance_term(search, sort):
+    # sort=recent (default) keeps the newest-first listing; sort=relevance ranks search matches
+    if sort not in ("recent", "relevance"):
+        raise HTTPException(status_code=400, detail="Sort must be 'recent' or 'relevance'")
+    return search if sort == "relevance" and search else None
+
+
+def can_view(user, evaluation):
+    # HR sees every evaluation, a manager their own, an intern theirs once it reaches them;
+    # everyone else gets a 404, so ids of other people's evaluations aren't confirmed
+    return evaluation is not None and (
+        user["role"] == "hr"
+        or (user["role"] == "manager" and evaluation.manager_id == user["email"])
+        or (
+            user["role"] == "intern"
+            and evaluation.intern_id == user["email"]
+            and evaluation.status in INTERN_VISIBLE_STATUSES
+        )
+    )
 
 
 @app.post("/register")
-def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db)):
     # Invite Code Check for privileged roles
     if request.role in ["manager", "hr"]:
         input_code = request.invite_code.strip() if request.invite_code else ""
@@ -98,11 +329,14 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
     if request.role not in ["manager", "intern", "hr"]:
         raise HTTPException(status_code=400, detail="Invalid role")
 
-    existing_user = db.query(models.User).filter(models.User.email == request.email).first()
+    existing_user = (await db.execute(
+        select(models.User).filter(models.User.email == request.email)
+    )).scalars().first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_pw = hash_password(request.password)
+    # bcrypt is CPU-bound; keep it off the event loop and the shared threadpool
+    hashed_pw = await run_password_job(hash_password, request.password)
 
     new_user = models.User(
         name=request.name,
@@ -112,50 +346,58 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.flush()
+    await sync_user(db, new_user.email)
+    # Names are searchable, so listings can change too
+    await bump_version(db, USERS)
+    await bump_version(db, EVALUATIONS)
+    await db.commit()
+    await db.refresh(new_user)
 
     return {"message": "User registered successfully"}
 
 from fastapi import Form
 
 @app.post("/login")
-def login(
+async def login(
     request: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(models.User).filter(
-        models.User.email == request.email
-    ).first()
+    user = (await db.execute(
+        select(models.User).filter(models.User.email == request.email)
+    )).scalars().first()
 
     if not user:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    if not verify_password(request.password, user.password):
+    valid, new_hash = await run_password_job(verify_and_update_password, request.password, user.password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account is deactivated. Contact HR.")
 
+    if new_hash:
+        # Stored hash predates the current BCRYPT_ROUNDS; upgrade it while we have the password
+        user.password = new_hash
+        await db.commit()
+
     token = create_access_token(
         data={"sub": user.email, "role": user.role}
     )
 
     return {"access_token": token, "token_type": "bearer"}
 @app.post("/create-evaluation")
-def create_evaluation(
+async def create_evaluation(
     request: EvaluationRequest,
     user: dict = Depends(require_role("manager")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
 
-    # ✅ VALIDATION STARTS HERE
-    if request.rating < 1 or request.rating > 5:
-        raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
-
-    if request.months_worked <= 0:
-        raise HTTPException(status_code=400, detail="Months worked must be positive")
-    # ✅ VALIDATION ENDS HERE
+    # ✅ VALIDATION (shared with the bulk endpoint)
+    error = evaluation_error(request.rating, request.months_worked)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
 
     new_evaluation = models.Evaluation(
         intern_id=request.intern_id,
@@ -166,35 +408,85 @@ def create_evaluation(
     )
 
     db.add(new_evaluation)
-    db.commit()
-    db.refresh(new_evaluation)
+    await db.flush()
+    await sync_evaluations(db, [new_evaluation.id])
+    await analytics.record(db, added=[analytics.contribution(new_evaluation)])
+    await bump_version(db, EVALUATIONS)
+    await db.commit()
+    await db.refresh(new_evaluation)
+    evaluation_counts.invalidate()
 
     return {"message": "Evaluation created successfully"}
+@app.post("/create-evaluations/bulk")
+async def create_evaluations_bulk(
+    request: Request,
+    user: dict = Depends(require_role("manager")),
+    db: AsyncSession = Depends(get_db)
+):
+    # JSON array or CSV (intern_id, rating, manager_comment, months_worked).
+    # Invalid rows are reported back; the valid ones are still created.
+    try:
+        items = await read_rows(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not items:
+        raise HTTPException(status_code=400, detail="No evaluations to create")
+    if len(items) > BULK_CREATE_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_CREATE_MAX_ROWS} evaluations per request")
+
+    valid, errors = validate_rows(items, EvaluationRequest)
+
+    created = []
+    if valid:
+        # One multi-row INSERT in one transaction instead of a commit + refresh per row
+        evaluations = (await db.execute(
+            insert(models.Evaluation).returning(models.Evaluation, sort_by_parameter_order=True),
+            [
+                {
+                    "intern_id": row.intern_id,
+                    "rating": row.rating,
+                    "manager_comment": row.manager_comment,
+                    "manager_id": user["email"],
+                    "months_worked": row.months_worked,
+                }
+                for _, row in valid
+            ],
+        )).scalars().all()
+        ids = [evaluation.id for evaluation in evaluations]
+        await sync_evaluations(db, ids)
+        await analytics.record(db, added=[analytics.contribution(e) for e in evaluations])
+        await bump_version(db, EVALUATIONS)
+        await db.commit()
+        evaluation_counts.invalidate()
+        created = [{"row": number, "id": evaluation_id} for (number, _), evaluation_id in zip(valid, ids)]
+
+    return {
+        "created": len(created),
+        "failed": len(errors),
+        "evaluations": created,
+        "errors": errors,
+    }
 @app.post("/submit-intern-feedback")
-def submit_intern_feedback(
+async def submit_intern_feedback(
     request: FeedbackRequest,
     user: dict = Depends(require_role("intern")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    evaluation = db.query(models.Evaluation).filter(models.Evaluation.id == request.evaluation_id).first()
-
-    if not evaluation:
-        raise HTTPException(status_code=404, detail="Evaluation not found")
-
-    if evaluation.status != "pending_intern":
-        raise HTTPException(status_code=400, detail="Invalid workflow state")
-
-    evaluation.intern_comment = request.comment
-    evaluation.status = "pending_hr"
-
-    db.commit()
+    # Status check and write in one statement; only the evaluation's intern may answer it
+    await transition_one(
+        db, request.evaluation_id, INTERN_FEEDBACK, {"intern_comment": request.comment},
+        models.Evaluation.intern_id == user["email"],
+    )
+    await db.commit()
+    evaluation_counts.invalidate()
 
     return {"message": "Intern feedback submitted"}
 @app.post("/submit-hr-review")
-def submit_hr_review(
+async def submit_hr_review(
     request: HRReviewRequest,
     user: dict = Depends(require_role("hr")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
 
     # ✅ VALIDATION HERE
@@ -204,41 +496,64 @@ def submit_hr_review(
             detail="Adjustment must be between -2 and 2"
         )
 
-    evaluation = db.query(models.Evaluation).filter(
-        models.Evaluation.id == request.evaluation_id
-    ).first()
-
-    if not evaluation:
-        raise HTTPException(status_code=404, detail="Evaluation not found")
-
-    if evaluation.status != "pending_hr":
-        raise HTTPException(status_code=400, detail="Invalid workflow state")
-
-    evaluation.hr_comment = request.comment
-    evaluation.hr_rating_adjustment = request.rating_adjustment
-    evaluation.status = "completed"
+    row = await transition_one(db, request.evaluation_id, HR_REVIEW, hr_review_values([request], datetime.utcnow()))
+    await db.commit()
+    evaluation_counts.invalidate()
+    await report_workers.enqueue(row.id)
 
-    # ✅ AUTO GENERATE AI REPORT ON COMPLETION
-    try:
-        report = generate_evaluation_report(evaluation)
-        evaluation.report = report
-    except Exception as e:
-        print(f"AI Report Generation failed: {e}")
-
-    db.commit()
-
-    return {"message": "HR review completed and AI report generated"}
+    return {"message": "HR review completed, AI report queued", "report_status": "queued"}
+@app.post("/hr/reviews/batch")
+async def submit_hr_reviews_batch(
+    request: HRReviewBatchRequest,
+    user: dict = Depends(require_role("hr")),
+    db: AsyncSession = Depends(get_db)
+):
+    # Completes every listed pending_hr evaluation in one transaction. Reviews that
+    # can't be applied are reported back; the others are still completed.
+    if not request.reviews:
+        raise HTTPException(status_code=400, detail="No reviews to submit")
+    if len(request.reviews) > HR_REVIEW_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {HR_REVIEW_BATCH_MAX} reviews per request")
+
+    reviews, errors = {}, []
+    for review in request.reviews:
+        if review.rating_adjustment < -2 or review.rating_adjustment > 2:
+            errors.append({"evaluation_id": review.evaluation_id, "status_code": 400, "error": "Adjustment must be between -2 and 2"})
+        elif review.evaluation_id in reviews:
+            errors.append({"evaluation_id": review.evaluation_id, "status_code": 400, "error": "Duplicate evaluation_id"})
+        else:
+            reviews[review.evaluation_id] = review
+
+    completed = []
+    if reviews:
+        rows = await transition(db, list(reviews), HR_REVIEW, hr_review_values(list(reviews.values()), datetime.utcnow()))
+        completed = [row.id for row in rows]
+        done = set(completed)
+        skipped = await failures(db, [i for i in reviews if i not in done])
+        errors += [
+            {"evaluation_id": evaluation_id, "status_code": status_code, "error": detail}
+            for evaluation_id, (status_code, detail) in skipped.items()
+        ]
+        if completed:
+            await db.commit()
+            evaluation_counts.invalidate()
+            await report_workers.enqueue_many(completed)
+
+    return {
+        "completed": len(completed),
+        "failed": len(errors),
+        "evaluation_ids": completed,
+        "errors": errors,
+    }
 @app.post("/generate-report/{evaluation_id}")
-def generate_report(
+async def generate_report(
     evaluation_id: int,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    evaluation = db.query(models.Evaluation).filter(
-        models.Evaluation.id == evaluation_id
-    ).first()
+    evaluation = await db.get(models.Evaluation, evaluation_id)
 
-    if not evaluation:
+    if not can_view(user, evaluation):
         raise HTTPException(status_code=404, detail="Evaluation not found")
 
     if evaluation.status != "completed":
@@ -248,94 +563,334 @@ def generate_report(
     if evaluation.report:
         return {"report": evaluation.report}
 
+    # A background job is already writing this report; poll /report-status for it
+    if evaluation.report_status in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Report is already being generated ({evaluation.report_status})")
+
     # ✅ Generate new report
-    report = generate_evaluation_report(evaluation)
+    report = await run_in_threadpool(generate_evaluation_report, evaluation)
 
     # ✅ Save report in DB
     evaluation.report = report
-    db.commit()
+    evaluation.report_status = "done"
+    await bump_version(db, EVALUATIONS)
+    await db.commit()
 
     return {"report": report}
-@app.get("/manager/evaluations")
-def get_manager_evaluations(
+
+@app.post("/generate-report/{evaluation_id}/stream")
+async def generate_report_stream(
+    evaluation_id: int,
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Same checks as /generate-report, but the report arrives as Server-Sent Events
+    # while Gemini writes it; see report_stream.py
+    evaluation = await db.get(models.Evaluation, evaluation_id)
+
+    if not can_view(user, evaluation):
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+
+    if evaluation.status != "completed":
+        raise HTTPException(status_code=400, detail="Evaluation not completed yet")
+
+    # A background job is already writing this report; poll /report-status for it
+    if not evaluation.report and evaluation.report_status in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Report is already being generated ({evaluation.report_status})")
+
+    return StreamingResponse(stream_report(evaluation), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/evaluations/{evaluation_id}", response_model=EvaluationDetail)
+async def get_evaluation(
+    evaluation_id: int,
+    request: Request,
+    response: Response,
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Full record (comments, AI report) for one card; listings only carry previews
+    _, not_modified = await conditional(request, response, db, user, EVALUATIONS)
+    if not_modified:
+        return not_modified
+
+    evaluation = await db.get(models.Evaluation, evaluation_id)
+
+    if not can_view(user, evaluation):
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+
+    return evaluation
+
+@app.get("/evaluations/{evaluation_id}/report.pdf")
+async def get_evaluation_pdf(
+    evaluation_id: int,
+    request: Request,
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    row = (await db.execute(
+        select(*PDF_COLUMNS, models.Evaluation.status).filter(models.Evaluation.id == evaluation_id)
+    )).first()
+
+    if not can_view(user, row):
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+    if row.status != "completed":
+        raise HTTPException(status_code=400, detail="Report PDFs are only available for completed evaluations")
+
+    # The content hash is the PDF's identity, so a browser copy revalidates without a render
+    digest = content_hash(row._mapping)
+    headers = {"ETag": f'"{digest[:32]}"', "Cache-Control": "private, no-cache"}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    _, pdf = (await report_pdfs(db, [row]))[evaluation_id]
+    if isinstance(pdf, Exception):
+        raise HTTPException(status_code=500, detail="Failed to render the report PDF")
+    headers["Content-Disposition"] = f'attachment; filename="{pdf_filename(evaluation_id)}"'
+    return Response(content=pdf, media_type="application/pdf", headers=headers)
+
+@app.get("/evaluations/{evaluation_id}/report-status")
+async def get_report_status(
+    evaluation_id: int,
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    row = (await db.execute(
+        select(
+            models.Evaluation.manager_id,
+            models.Evaluation.intern_id,
+            models.Evaluation.status,
+            models.Evaluation.report_status,
+            models.Evaluation.report,
+        ).filter(models.Evaluation.id == evaluation_id)
+    )).first()
+
+    if not can_view(user, row):
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+
+    return {
+        "evaluation_id": evaluation_id,
+        "report_status": row.report_status,
+        "report": row.report if row.report_status == "done" else None,
+    }
+
+@app.post("/hr/generate-reports")
+async def generate_reports_bulk(
+    request: BulkReportRequest,
+    user: dict = Depends(require_role("hr")),
+    db: AsyncSession = Depends(get_db)
+):
+    if request.limit < 1 or request.limit > 5000:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 5000")
+
+    # Completed evaluations with no report, and no background job already working on one
+    query = select(models.Evaluation.id).filter(
+        models.Evaluation.status == "completed",
+        or_(models.Evaluation.report.is_(None), models.Evaluation.report == ""),
+        or_(models.Evaluation.report_status.is_(None), models.Evaluation.report_status == "failed"),
+    )
+
+    if request.evaluation_ids:
+        query = query.filter(models.Evaluation.id.in_(request.evaluation_ids))
+    if request.manager_id:
+        query = query.filter(models.Evaluation.manager_id == request.manager_id)
+    if request.search:
+        query = query.filter(search_filter(request.search))
+
+    eligible = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar()
+    candidates = (await db.execute(
+        query.order_by(models.Evaluation.id).limit(request.limit)
+    )).scalars().all()
+    claimed = await claim(db, candidates)
+    evaluations = (await db.execute(
+        select(models.Evaluation).filter(models.Evaluation.id.in_(claimed)).order_by(models.Evaluation.id)
+    )).scalars().all() if claimed else []
+
+    # skipped: asked-for ids that aren't eligible, or were claimed elsewhere first;
+    # truncated: eligible rows past the limit, left for another run
+    skipped = len(candidates) - len(claimed)
+    if request.evaluation_ids:
+        skipped += len(set(request.evaluation_ids)) - eligible
+    truncated = eligible - len(candidates)
+
+    # Progress is streamed as one JSON object per line
+    return StreamingResponse(
+        stream_bulk_reports(evaluations, skipped=skipped, truncated=truncated),
+        media_type="application/x-ndjson",
+    )
+@app.get("/manager/evaluations", response_model=EvaluationPage)
+async def get_manager_evaluations(
+    request: Request,
+    response: Response,
     search: str = None,
     status: str = None,
+    sort: str = "recent",
     skip: int = 0,
+    cursor: str = None,
     limit: int = 50,
+    include_total: bool = True,
     user: dict = Depends(require_role("manager")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(models.Evaluation).filter(models.Evaluation.manager_id == user["email"])
-    if search:
-        query = query.filter(models.Evaluation.intern_id.contains(search))
-    if status:
-        query = query.filter(models.Evaluation.status == status)
-    
-    total = query.count()
-    evaluations = query.offset(skip).limit(limit).all()
-    return {"total": total, "evaluations": evaluations}
-
-@app.get("/intern/evaluations")
-def get_intern_evaluations(
+    versions, not_modified = await conditional(request, response, db, user, EVALUATIONS)
+    if not_modified:
+        return not_modified
+
+    query = manager_evaluations_query(user["email"], search=search, status=status, columns=LISTING_COLUMNS)
+    # Keyed by version too, so a write on any worker retires the cached total
+    count_key = ("manager", user["email"], search, status, versions)
+    rank_by = relevance_term(search, sort)
+    return await paginate(db, query, skip, limit, cursor, include_total, count_key, rank_by)
+
+@app.get("/intern/evaluations", response_model=EvaluationPage)
+async def get_intern_evaluations(
+    request: Request,
+    response: Response,
     skip: int = 0,
+    cursor: str = None,
     limit: int = 50,
+    include_total: bool = True,
     user: dict = Depends(require_role("intern")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(models.Evaluation).filter(
-        models.Evaluation.intern_id == user["email"],
-        models.Evaluation.status.in_(["pending_intern", "pending_hr", "completed"])
-    )
-    total = query.count()
-    evaluations = query.offset(skip).limit(limit).all()
-    return {"total": total, "evaluations": evaluations}
-
-@app.get("/hr/evaluations")
-def get_hr_evaluations(
+    versions, not_modified = await conditional(request, response, db, user, EVALUATIONS)
+    if not_modified:
+        return not_modified
+
+    query = intern_evaluations_query(user["email"], columns=LISTING_COLUMNS)
+    count_key = ("intern", user["email"], versions)
+    return await paginate(db, query, skip, limit, cursor, include_total, count_key)
+
+@app.get("/hr/evaluations", response_model=EvaluationPage)
+async def get_hr_evaluations(
+    request: Request,
+    response: Response,
     search: str = None,
     status: str = None,
+    sort: str = "recent",
     skip: int = 0,
+    cursor: str = None,
     limit: int = 50,
+    include_total: bool = True,
     user: dict = Depends(require_role("hr")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(models.Evaluation)
-    
-    if status:
-        query = query.filter(models.Evaluation.status == status)
-    else:
-        # Default view for HR: pending items or historical completed items
-        query = query.filter(models.Evaluation.status.in_(["pending_hr", "completed"]))
+    versions, not_modified = await conditional(request, response, db, user, EVALUATIONS)
+    if not_modified:
+        return not_modified
 
-    if search:
-        query = query.filter(
-            (models.Evaluation.intern_id.contains(search)) | 
-            (models.Evaluation.manager_id.contains(search))
-        )
+    query = hr_evaluations_query(search=search, status=status, columns=LISTING_COLUMNS)
+    count_key = ("hr", search, status, versions)
+    rank_by = relevance_term(search, sort)
+    return await paginate(db, query, skip, limit, cursor, include_total, count_key, rank_by)
 
-    total = query.count()
-    evaluations = query.offset(skip).limit(limit).all()
-    return {"total": total, "evaluations": evaluations}
+@app.get("/hr/evaluations/export")
+async def export_hr_evaluations(
+    search: str = None,
+    status: str = None,
+    format: str = "csv",
+    user: dict = Depends(require_role("hr"))
+):
+    # Same filters as /hr/evaluations, streamed in full instead of paged
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be 'csv' or 'ndjson'")
+
+    query = hr_evaluations_query(search=search, status=status, columns=EXPORT_COLUMNS).order_by(*DASHBOARD_ORDER)
+    filename = f"evaluations-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_export(query, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
-@app.get("/hr/users")
-def get_all_users(
+@app.get("/hr/reports.zip")
+async def export_hr_report_pdfs(
+    search: str = None,
+    manager_id: str = None,
+    cohort: str = None,
+    user: dict = Depends(require_role("hr"))
+):
+    # Every completed evaluation matching the filters as one PDF per report. Cached PDFs
+    # are reused; the rest are rendered on the PDF pool while the archive streams.
+    query = hr_evaluations_query(search=search, status="completed", columns=[models.Evaluation.id])
+    if manager_id:
+        query = query.filter(models.Evaluation.manager_id == manager_id)
+    if cohort:
+        # YYYY-MM of created_at, as in /hr/analytics
+        try:
+            month = datetime.strptime(cohort, "%Y-%m")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Cohort must be YYYY-MM")
+        next_month = month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+        query = query.filter(models.Evaluation.created_at >= month, models.Evaluation.created_at < next_month)
+
+    filename = f"reports-{cohort or datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.zip"
+    return StreamingResponse(
+        stream_reports_zip(query.order_by(*DASHBOARD_ORDER)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get("/hr/analytics")
+async def get_hr_analytics(
+    request: Request,
+    response: Response,
+    user: dict = Depends(require_role("hr")),
+    db: AsyncSession = Depends(get_db)
+):
+    # Status funnel, average final rating and time to completion, overall, per manager
+    # and per cohort (month created), read from evaluation_stats rather than evaluations
+    _, not_modified = await conditional(request, response, db, user, EVALUATIONS)
+    if not_modified:
+        return not_modified
+    return await analytics.load_summary(db)
+
+@app.get("/hr/users", response_model=UserPage)
+async def get_all_users(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 50,
     user: dict = Depends(require_role("hr")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    return db.query(models.User).all()
+    if limit < 1 or limit > 500:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 500")
+
+    _, not_modified = await conditional(request, response, db, user, USERS)
+    if not_modified:
+        return not_modified
+
+    rows = (await db.execute(
+        select(*USER_COLUMNS).order_by(models.User.id).offset(skip).limit(limit + 1)
+    )).all()
+    has_more = len(rows) > limit
+    users = rows[:limit]
+
+    if not has_more and (users or skip == 0):
+        total = skip + len(users)
+    else:
+        total = (await db.execute(select(func.count()).select_from(models.User))).scalar_one()
+
+    return {"total": total, "users": users, "has_more": has_more}
 
 @app.post("/hr/toggle-user")
-def toggle_user(
+async def toggle_user(
     email: str,
     user: dict = Depends(require_role("hr")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    target_user = db.query(models.User).filter(models.User.email == email).first()
+    target_user = (await db.execute(
+        select(models.User).filter(models.User.email == email)
+    )).scalars().first()
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Toggle status
     target_user.is_active = 0 if target_user.is_active else 1
-    db.commit()
+    await bump_user_version(db)
+    await bump_version(db, USERS)
+    await db.commit()
+    # Takes effect on this worker now; other workers pick up the version bump
+    user_status.invalidate(email)
     return {"message": f"User status updated to {'active' if target_user.is_active else 'inactive'}"}
 
@@ -0,0 +1,211 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Request, SQL, bcrypt and Gemini timings, exposed in Prometheus text format on /metrics.
+# Histograms are plain dicts of bucket counts behind a lock: observing is a bisect and a
+# few additions, cheap enough to leave on in production. Each process (or serverless
+# instance) keeps its own numbers; Prometheus sums them across scrape targets.
+#   METRICS=on (default) | off        - off skips the middleware and the SQL hooks
+#   METRICS_TOKEN                     - if set, /metrics wants "Authorization: Bearer <token>"
+#   SERVER_TIMING=off (default) | on  - adds a Server-Timing header (app, db, bcrypt, gemini, pdf)
+
+METRICS_ENABLED = os.getenv("METRICS", "on").lower() not in ("off", "0", "false")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+SERVER_TIMING = os.getenv("SERVER_TIMING", "off").lower() in ("on", "1", "true")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# A listing takes 2-3 queries; a request at the top buckets is an N+1 worth looking at
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), then sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            labels = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to the end of the response, by route template",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements run while serving one request",
+    ("method", "route"), QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL while serving one request",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Time per SQL statement, requests and background jobs",
+    (), QUERY_BUCKETS,
+)
+PASSWORD_SECONDS = Histogram(
+    "password_hash_duration_seconds", "bcrypt work including the wait for a pool worker",
+    ("operation",), LATENCY_BUCKETS,
+)
+REPORT_SECONDS = Histogram(
+    "report_generation_duration_seconds", "generate_evaluation_report, report cache hits included",
+    (), LATENCY_BUCKETS,
+)
+GEMINI_SECONDS = Histogram(
+    "gemini_request_duration_seconds", "Gemini calls, rate limiter wait included",
+    (), LATENCY_BUCKETS,
+)
+PDF_RENDER_SECONDS = Histogram(
+    "pdf_render_duration_seconds", "Report PDF renders including the wait for a pool worker",
+    (), LATENCY_BUCKETS,
+)
+
+HISTOGRAMS = [
+    REQUEST_SECONDS, REQUEST_QUERIES, REQUEST_DB_SECONDS, QUERY_SECONDS,
+    PASSWORD_SECONDS, REPORT_SECONDS, GEMINI_SECONDS, PDF_RENDER_SECONDS,
+]
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.spans = {}
+        # Tasks started during the request (report workers) inherit this object; once
+        # the response is done their queries no longer belong to it
+        self.finished = False
+
+    def add(self, span, seconds):
+        if not self.finished:
+            self.spans[span] = self.spans.get(span, 0.0) + seconds
+
+    def server_timing(self, total):
+        entries = [f"app;dur={total * 1000:.1f}"]
+        if self.queries:
+            entries.append(f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"')
+        entries += [f"{span};dur={seconds * 1000:.1f}" for span, seconds in self.spans.items()]
+        return ", ".join(entries).encode("latin-1")
+
+
+_current = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def timed(histogram, *label_values, span=None):
+    # Observes the block's duration, and adds it to the current request's Server-Timing
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, *label_values)
+        timings = _current.get()
+        if span and timings is not None:
+            timings.add(span, elapsed)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    QUERY_SECONDS.observe(elapsed)
+    timings = _current.get()
+    if timings is not None and not timings.finished:
+        timings.queries += 1
+        timings.db_seconds += elapsed
+
+
+if METRICS_ENABLED:
+    # On the Engine class so the lazily built sync and async engines are both covered
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    def __init__(self, app, server_timing=SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    header = (b"server-timing", timings.server_timing(time.perf_counter() - started))
+                    message = {**message, "headers": [*message.get("headers", []), header]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            timings.finished = True
+            _current.reset(token)
+            # Route templates, not raw paths, so /evaluations/{evaluation_id} is one series
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            REQUEST_SECONDS.observe(elapsed, method, path, str(status))
+            REQUEST_QUERIES.observe(timings.queries, method, path)
+            REQUEST_DB_SECONDS.observe(timings.db_seconds, method, path)
+
+
+def render():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,182 @@
+import threading
+from datetime import datetime
+from sqlalchemy import inspect, text
+from . import models
+from . import search
+from . import analytics
+from . import etags
+
+# Versioned schema migrations.
+# Each entry is (version, description, fn). fn receives an open connection inside
+# a transaction and must be idempotent, because a fresh database gets the full
+# current schema from migration 1 and later steps then find their work done.
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+# Arbitrary key for pg_advisory_lock so concurrent cold starts don't race
+ADVISORY_LOCK_ID = 80240001
+
+
+def _column_names(conn, table):
+    return [c["name"] for c in inspect(conn).get_columns(table)]
+
+
+def _add_column(conn, table, column, ddl):
+    if column not in _column_names(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _create_base_tables(conn):
+    models.Base.metadata.create_all(bind=conn)
+
+
+def _add_users_is_active(conn):
+    # Previously done by hand with backend/migrate_db.py
+    _add_column(conn, "users", "is_active", "INTEGER DEFAULT 1")
+
+
+def _add_report_jobs(conn):
+    _add_column(conn, "evaluations", "report_status", "VARCHAR")
+    models.ReportJob.__table__.create(bind=conn, checkfirst=True)
+
+
+def _add_report_cache(conn):
+    models.ReportCacheEntry.__table__.create(bind=conn, checkfirst=True)
+
+
+def _add_dashboard_indexes(conn):
+    # Listings now ORDER BY created_at; rows copied without it (older migrate_to_postgres runs) get one
+    conn.execute(text("UPDATE evaluations SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL"))
+    for index in models.Evaluation.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
+
+
+def _add_search_index(conn):
+    search.create_search_table(conn)
+    search.rebuild(conn)
+
+
+def _add_auth_state(conn):
+    models.AuthState.__table__.create(bind=conn, checkfirst=True)
+    if conn.execute(text("SELECT COUNT(*) FROM auth_state WHERE id = 1")).scalar() == 0:
+        conn.execute(text("INSERT INTO auth_state (id, users_version) VALUES (1, 0)"))
+
+
+def _add_evaluation_stats(conn):
+    _add_column(conn, "evaluations", "completed_at", "TIMESTAMP")
+    models.EvaluationStats.__table__.create(bind=conn, checkfirst=True)
+    analytics.rebuild(conn)
+
+
+def _add_data_versions(conn):
+    models.DataVersion.__table__.create(bind=conn, checkfirst=True)
+    for name in etags.VERSION_NAMES:
+        if conn.execute(text("SELECT COUNT(*) FROM data_versions WHERE name = :name"), {"name": name}).scalar() == 0:
+            conn.execute(text("INSERT INTO data_versions (name, version) VALUES (:name, 0)"), {"name": name})
+
+
+def _add_report_pdfs(conn):
+    models.ReportPdf.__table__.create(bind=conn, checkfirst=True)
+
+
+MIGRATIONS = [
+    (1, "create base tables", _create_base_tables),
+    (2, "add users.is_active", _add_users_is_active),
+    (3, "add evaluations.report_status and report_jobs", _add_report_jobs),
+    (4, "add report_cache", _add_report_cache),
+    (5, "add composite indexes for dashboard listings", _add_dashboard_indexes),
+    (6, "add evaluation_search full-text index", _add_search_index),
+    (7, "add auth_state user version counter", _add_auth_state),
+    (8, "add evaluations.completed_at and evaluation_stats", _add_evaluation_stats),
+    (9, "add data_versions write counters", _add_data_versions),
+    (10, "add report_pdfs", _add_report_pdfs),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(255), "
+        "applied_at TIMESTAMP)"
+    ))
+
+
+def current_version(conn):
+    _ensure_version_table(conn)
+    version = conn.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar()
+    return version or 0
+
+
+def run_migrations(engine):
+    is_postgres = engine.dialect.name == "postgresql"
+
+    with engine.connect() as lock_conn:
+        if is_postgres:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+            lock_conn.commit()
+        try:
+            with engine.begin() as conn:
+                version = current_version(conn)
+
+            for migration_version, description, fn in MIGRATIONS:
+                if migration_version <= version:
+                    continue
+                with engine.begin() as conn:
+                    fn(conn)
+                    conn.execute(
+                        text(
+                            f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, description, applied_at) "
+                            "VALUES (:version, :description, :applied_at)"
+                        ),
+                        {
+                            "version": migration_version,
+                            "description": description,
+                            "applied_at": datetime.utcnow(),
+                        },
+                    )
+                print(f"✅ Applied migration {migration_version}: {description}")
+                version = migration_version
+        finally:
+            if is_postgres:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+                lock_conn.commit()
+
+    return version
+
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def schema_ready():
+    return _schema_ready
+
+
+def ensure_schema(engine):
+    # Runs migrations once per process (or serverless cold start).
+    # After the first success this is a single flag check.
+    global _schema_ready
+    if _schema_ready:
+        return True
+
+    with _schema_lock:
+        if _schema_ready:
+            return True
+        try:
+            run_migrations(engine)
+            _schema_ready = True
+        except Exception as e:
+            # Keep serving; the next request retries instead of crashing startup on a slow DB
+            print(f"⚠️ Schema migration failed (will retry): {e}")
+
+    return _schema_ready
+
+
+if __name__ == "__main__":
+    from .database import engine
+
+    applied = run_migrations(engine)
+    print(f"Schema is at version {applied} (latest: {LATEST_VERSION})")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import BigInteger, Column, Integer, LargeBinary, String, Text, DateTime, Index
 from .database import Base
 from datetime import datetime
 
@@ -16,6 +16,14 @@ class User(Base):
 
 class Evaluation(Base):
     __tablename__ = "evaluations"
+    __table_args__ = (
+        # One index per dashboard access pattern, each ending in the listing order
+        Index("ix_evaluations_manager_status_created", "manager_id", "status", "created_at", "id"),
+        Index("ix_evaluations_manager_created", "manager_id", "created_at", "id"),
+        Index("ix_evaluations_intern_created", "intern_id", "created_at", "id"),
+        Index("ix_evaluations_status_created", "status", "created_at", "id"),
+        Index("ix_evaluations_created", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -32,5 +40,72 @@ class Evaluation(Base):
     status = Column(String, default="pending_intern")
 
     report = Column(Text, nullable=True)  # 👈 NEW FIELD
+    report_status = Column(String, nullable=True)  # queued / running / done / failed
 
     created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)  # set by the HR review
+
+
+class ReportJob(Base):
+    # Durable queue rows for the "table" report job backend (see report_jobs.py)
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    evaluation_id = Column(Integer, nullable=False, index=True)
+    status = Column(String, nullable=False, default="queued", index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime, default=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ReportCacheEntry(Base):
+    # Persistent tier of the AI report cache (see report_cache.py)
+    __tablename__ = "report_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 of model name + normalized prompt
+    model_name = Column(String, nullable=False)
+    report = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ReportPdf(Base):
+    # Rendered report PDFs (see pdf_reports.py); stale once content_hash stops matching
+    __tablename__ = "report_pdfs"
+
+    evaluation_id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), nullable=False)  # sha256 of the fields the PDF shows
+    pdf = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AuthState(Base):
+    # Single row (id=1); users_version moves whenever a user's active flag or role changes
+    # so every worker can drop its cached user status (see auth.UserStatusCache)
+    __tablename__ = "auth_state"
+
+    id = Column(Integer, primary_key=True)
+    users_version = Column(Integer, nullable=False, default=0)
+
+
+class DataVersion(Base):
+    # One write counter per kind of data ("evaluations", "users"), bumped in the same
+    # transaction as every write; dashboard ETags are derived from it (see etags.py)
+    __tablename__ = "data_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class EvaluationStats(Base):
+    # Per (manager, cohort month, status) aggregates behind /hr/analytics (see analytics.py)
+    __tablename__ = "evaluation_stats"
+
+    manager_id = Column(String, primary_key=True)
+    cohort = Column(String(7), primary_key=True)  # YYYY-MM of created_at
+    status = Column(String, primary_key=True)
+    evaluations = Column(Integer, nullable=False, default=0)
+    rating_total = Column(Integer, nullable=False, default=0)  # sum of rating + hr_rating_adjustment
+    completion_seconds = Column(BigInteger, nullable=False, default=0)  # sum of completed_at - created_at
+    timed_completions = Column(Integer, nullable=False, default=0)  # rows with both timestamps
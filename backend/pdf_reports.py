@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import json
+import os
+import zipfile
+from datetime import datetime
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from .database import AsyncSessionLocal
+from .executors import LazyExecutor, pool_kind
+from . import metrics
+from . import models
+
+# Report PDFs rendered on the server: GET /evaluations/{id}/report.pdf and
+# GET /hr/reports.zip. Same layout as the browser-side jsPDF version this replaces.
+# Rendered PDFs are kept in report_pdfs next to a sha256 of every field the PDF shows,
+# so a changed report, comment or rating makes the stored copy stale and the next
+# download renders it again. Bump PDF_LAYOUT_VERSION when the layout changes.
+# fpdf2 costs ~0.3s to import, so it is only loaded by the first render (in the
+# worker processes, with the default pool), never at app start.
+#   PDF_RENDER_POOL=process (default) | thread (default on Vercel)
+#   PDF_RENDER_WORKERS   - defaults to the core count
+#   PDF_ZIP_BATCH_SIZE   - reports loaded, rendered and written per step of the ZIP
+
+PDF_RENDER_POOL = pool_kind("PDF_RENDER_POOL")
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", str(os.cpu_count() or 1)))
+PDF_ZIP_BATCH_SIZE = int(os.getenv("PDF_ZIP_BATCH_SIZE", "50"))
+
+PDF_LAYOUT_VERSION = 1
+
+PDF_COLUMNS = [
+    models.Evaluation.id,
+    models.Evaluation.intern_id,
+    models.Evaluation.manager_id,
+    models.Evaluation.months_worked,
+    models.Evaluation.rating,
+    models.Evaluation.hr_rating_adjustment,
+    models.Evaluation.manager_comment,
+    models.Evaluation.hr_comment,
+    models.Evaluation.report,
+    models.Evaluation.created_at,
+]
+
+MARGIN = 20
+SLATE = (30, 41, 59)
+INDIGO = (99, 102, 241)
+WHITE = (255, 255, 255)
+
+# The built-in PDF fonts only cover latin-1; Gemini output is full of typographic punctuation
+_PUNCTUATION = str.maketrans({
+    "‘": "'", "’": "'", "“": '"', "”": '"',
+    "–": "-", "—": "-", "•": "-", "…": "...", " ": " ",
+})
+
+
+def pdf_filename(evaluation_id):
+    return f"Algo8_Report_Eval_{evaluation_id}.pdf"
+
+
+def content_hash(fields):
+    values = [PDF_LAYOUT_VERSION] + [
+        value.isoformat() if hasattr(value, "isoformat") else value
+        for value in (fields[column.name] for column in PDF_COLUMNS)
+    ]
+    return hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()
+
+
+def _text(value):
+    return str(value).translate(_PUNCTUATION).encode("latin-1", "replace").decode("latin-1")
+
+
+def _paragraphs(pdf, text, width, line_height=5):
+    # Greedy word wrap, one cell per line. fpdf2's multi_cell re-measures the line for
+    # every character, which was ~95% of the render time for a 4000 character report.
+    space = pdf.get_string_width(" ")
+    measured = {}
+    for paragraph in text.split("\n"):
+        words = paragraph.split(" ")
+        for word in words:
+            if word not in measured:
+                measured[word] = pdf.get_string_width(word)
+        widths = [measured[word] for word in words]
+        if any(w > width for w in widths):
+            # A word longer than the line (a URL): let multi_cell break it
+            pdf.multi_cell(width, line_height, paragraph, new_x="LMARGIN", new_y="NEXT")
+            continue
+        line, line_width = [], 0.0
+        for word, word_width in zip(words, widths):
+            if line and line_width + space + word_width > width:
+                pdf.cell(width, line_height, " ".join(line), new_x="LMARGIN", new_y="NEXT")
+                line, line_width = [], 0.0
+            line_width += (space if line else 0) + word_width
+            line.append(word)
+        pdf.cell(width, line_height, " ".join(line), new_x="LMARGIN", new_y="NEXT")
+
+
+_pdf_class = None
+
+
+def _report_pdf_class():
+    global _pdf_class
+    if _pdf_class is None:
+        from fpdf import FPDF
+
+        class ReportPDF(FPDF):
+            def footer(self):
+                self.set_y(-12)
+                self.set_font("helvetica", size=8)
+                self.set_text_color(*SLATE)
+                self.cell(
+                    0, 5, f"Confidential - Algo8.ai Intern Management System - Page {self.page_no()} of {{nb}}",
+                    align="C",
+                )
+
+        _pdf_class = ReportPDF
+    return _pdf_class
+
+
+def render_pdf(fields):
+    # Module-level and given a plain dict so it can run in a worker process
+    pdf = _report_pdf_class()(format="A4")
+    pdf.set_margins(MARGIN, MARGIN, MARGIN)
+    pdf.set_auto_page_break(True, margin=20)
+    width = pdf.w - 2 * MARGIN
+
+    pdf.add_page()
+    pdf.set_fill_color(*SLATE)
+    pdf.rect(0, 0, pdf.w, 40, "F")
+    pdf.set_text_color(*WHITE)
+    pdf.set_font("helvetica", "B", 22)
+    pdf.text(MARGIN, 25, "Algo8.ai")
+    pdf.set_font("helvetica", size=10)
+    pdf.text(MARGIN, 35, "INTERN PERFORMANCE REPORT")
+
+    pdf.set_draw_color(*INDIGO)
+    pdf.set_line_width(1)
+    pdf.line(MARGIN, 45, pdf.w - MARGIN, 45)
+
+    created_at = fields["created_at"]
+    pdf.set_text_color(*SLATE)
+    pdf.set_font("helvetica", "B", 12)
+    pdf.text(MARGIN, 55, f"Evaluation ID: #{fields['id']}")
+    pdf.text(pdf.w - MARGIN - 40, 55, f"Date: {created_at:%d %b %Y}" if created_at else "Date: -")
+
+    pdf.set_font("helvetica", "B", 14)
+    pdf.text(MARGIN, 70, "Participant Information")
+    pdf.set_font("helvetica", size=10)
+    pdf.text(MARGIN, 80, _text(f"Intern Email: {fields['intern_id']}"))
+    pdf.text(MARGIN, 85, _text(f"Manager Email: {fields['manager_id']}"))
+    pdf.text(MARGIN, 90, f"Duration: {fields['months_worked']} Months")
+
+    adjustment = fields["hr_rating_adjustment"] or 0
+    pdf.set_font("helvetica", "B", 10)
+    pdf.text(MARGIN, 105, "Ratings")
+    pdf.set_font("helvetica", size=10)
+    pdf.text(MARGIN, 112, f"Manager Rating: {fields['rating']}/5")
+    pdf.text(MARGIN, 117, f"HR Adjustment: {'+' if adjustment > 0 else ''}{adjustment}")
+    pdf.set_font("helvetica", "B", 10)
+    pdf.text(MARGIN, 125, f"Final Performance Score: {min(5, max(1, fields['rating'] + adjustment))}/5")
+
+    pdf.set_font("helvetica", "B", 12)
+    pdf.text(MARGIN, 140, "Management Comments")
+    pdf.set_font("helvetica", size=9)
+    pdf.set_xy(MARGIN, 143)
+    _paragraphs(pdf, _text(f"Manager: {fields['manager_comment']}"), width)
+    pdf.ln(5)
+    _paragraphs(pdf, _text(f"HR: {fields['hr_comment'] or 'No additional comments.'}"), width)
+
+    pdf.add_page()
+    pdf.set_fill_color(*SLATE)
+    pdf.rect(0, 0, pdf.w, 20, "F")
+    pdf.set_text_color(*WHITE)
+    pdf.set_font("helvetica", "B", 12)
+    pdf.text(MARGIN, 13, "AI Generated Analysis")
+    pdf.set_text_color(*SLATE)
+    pdf.set_font("helvetica", size=10)
+    pdf.set_xy(MARGIN, 30)
+    _paragraphs(pdf, _text(fields["report"] or "AI Analysis pending."), width)
+
+    return bytes(pdf.output())
+
+
+_render_executor = LazyExecutor(PDF_RENDER_POOL, PDF_RENDER_WORKERS, "pdf", "PDF render")
+
+
+def shutdown_render_pool():
+    _render_executor.shutdown()
+
+
+async def render(fields):
+    loop = asyncio.get_running_loop()
+    with metrics.timed(metrics.PDF_RENDER_SECONDS, span="pdf"):
+        return await loop.run_in_executor(_render_executor.get(), render_pdf, fields)
+
+
+async def report_pdfs(db, rows):
+    # {evaluation id: (content hash, pdf bytes or an exception)} for PDF_COLUMNS rows.
+    # Stored copies are used when their hash still matches; the rest are rendered
+    # concurrently on the pool and stored in one commit.
+    hashes = {row.id: content_hash(row._mapping) for row in rows}
+    stored = (await db.execute(
+        select(models.ReportPdf.evaluation_id, models.ReportPdf.content_hash, models.ReportPdf.pdf)
+        .filter(models.ReportPdf.evaluation_id.in_(list(hashes)))
+    )).all()
+    pdfs = {
+        evaluation_id: (digest, pdf)
+        for evaluation_id, digest, pdf in stored
+        if hashes[evaluation_id] == digest
+    }
+
+    missing = [row for row in rows if row.id not in pdfs]
+    if not missing:
+        return pdfs
+    rendered = await asyncio.gather(*(render(dict(row._mapping)) for row in missing), return_exceptions=True)
+
+    fresh = []
+    for row, pdf in zip(missing, rendered):
+        pdfs[row.id] = (hashes[row.id], pdf)
+        if isinstance(pdf, Exception):
+            print(f"⚠️ PDF render failed for evaluation {row.id}: {pdf}")
+        else:
+            fresh.append({
+                "evaluation_id": row.id, "content_hash": hashes[row.id],
+                "pdf": pdf, "created_at": datetime.utcnow(),
+            })
+    if fresh:
+        try:
+            await db.execute(delete(models.ReportPdf).filter(
+                models.ReportPdf.evaluation_id.in_([entry["evaluation_id"] for entry in fresh])
+            ))
+            await db.execute(insert(models.ReportPdf), fresh)
+            await db.commit()
+        except IntegrityError:
+            # Another request stored the same evaluations first; ours are served anyway
+            await db.rollback()
+    return pdfs
+
+
+class _ZipSink:
+    # Write-only file for zipfile. Without seek() it writes each entry's sizes in a data
+    # descriptor after the data, so finished entries can be sent on straight away.
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_reports_zip(id_query, batch_size=PDF_ZIP_BATCH_SIZE, session_factory=AsyncSessionLocal):
+    # id_query selects evaluation ids in archive order. Only the ids are held for the
+    # whole export; rows and PDFs are loaded one batch at a time.
+    sink = _ZipSink()
+    failed = []
+    stamp = datetime.utcnow().timetuple()[:6]
+    async with session_factory() as db:
+        ids = (await db.execute(id_query)).scalars().all()
+        # PDFs are already deflated, so entries are stored as they are
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                rows = (await db.execute(select(*PDF_COLUMNS).filter(models.Evaluation.id.in_(batch)))).all()
+                pdfs = await report_pdfs(db, rows)
+                for evaluation_id in batch:
+                    if evaluation_id not in pdfs:
+                        continue  # deleted since the ids were read
+                    _, pdf = pdfs[evaluation_id]
+                    if isinstance(pdf, Exception):
+                        failed.append(evaluation_id)
+                        continue
+                    archive.writestr(zipfile.ZipInfo(pdf_filename(evaluation_id), stamp), pdf)
+                yield sink.drain()
+            if failed:
+                archive.writestr(
+                    zipfile.ZipInfo("errors.txt", stamp),
+                    "Reports that could not be rendered (evaluation ids):\n"
+                    + "\n".join(str(evaluation_id) for evaluation_id in failed) + "\n",
+                )
+    yield sink.drain()
@@ -0,0 +1,90 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, func, select, tuple_
+from . import models
+from .search import search_filter
+
+# Listing queries shared by the dashboard endpoints, exports and benchmarks.
+# Each has a matching composite index on evaluations (see models.Evaluation).
+
+INTERN_VISIBLE_STATUSES = ["pending_intern", "pending_hr", "completed"]
+HR_DEFAULT_STATUSES = ["pending_hr", "completed"]
+
+# Newest first; id breaks ties between rows created in the same instant
+DASHBOARD_ORDER = (models.Evaluation.created_at.desc(), models.Evaluation.id.desc())
+
+# Listing pages carry comment previews and a has_report flag; the full comments and
+# the AI report come from GET /evaluations/{id}
+COMMENT_PREVIEW_CHARS = 200
+
+LISTING_COLUMNS = [
+    models.Evaluation.id,
+    models.Evaluation.intern_id,
+    models.Evaluation.manager_id,
+    models.Evaluation.rating,
+    models.Evaluation.hr_rating_adjustment,
+    models.Evaluation.months_worked,
+    models.Evaluation.status,
+    models.Evaluation.report_status,
+    models.Evaluation.created_at,
+    models.Evaluation.completed_at,
+    func.substr(models.Evaluation.manager_comment, 1, COMMENT_PREVIEW_CHARS).label("manager_comment_preview"),
+    func.substr(models.Evaluation.intern_comment, 1, COMMENT_PREVIEW_CHARS).label("intern_comment_preview"),
+    and_(models.Evaluation.report.isnot(None), models.Evaluation.report != "").label("has_report"),
+]
+
+
+# Keyset pagination: the cursor is the (created_at, id) of the last row on the page,
+# opaque to clients. The next page is everything strictly after it in DASHBOARD_ORDER,
+# which the composite indexes serve directly instead of walking an OFFSET.
+
+def encode_cursor(created_at, evaluation_id):
+    raw = f"{created_at.isoformat()}|{evaluation_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    # Raises ValueError on anything that isn't a cursor we issued
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, evaluation_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(evaluation_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def after_cursor(query, cursor):
+    created_at, evaluation_id = decode_cursor(cursor)
+    return query.filter(
+        tuple_(models.Evaluation.created_at, models.Evaluation.id) < tuple_(created_at, evaluation_id)
+    )
+
+
+def manager_evaluations_query(manager_email, search=None, status=None, columns=None):
+    query = select(*(columns or [models.Evaluation])).filter(models.Evaluation.manager_id == manager_email)
+    if search:
+        query = query.filter(search_filter(search))
+    if status:
+        query = query.filter(models.Evaluation.status == status)
+    return query
+
+
+def intern_evaluations_query(intern_email, columns=None):
+    return select(*(columns or [models.Evaluation])).filter(
+        models.Evaluation.intern_id == intern_email,
+        models.Evaluation.status.in_(INTERN_VISIBLE_STATUSES)
+    )
+
+
+def hr_evaluations_query(search=None, status=None, columns=None):
+    query = select(*(columns or [models.Evaluation]))
+
+    if status:
+        query = query.filter(models.Evaluation.status == status)
+    else:
+        # Default view for HR: pending items or historical completed items
+        query = query.filter(models.Evaluation.status.in_(HR_DEFAULT_STATUSES))
+
+    if search:
+        query = query.filter(search_filter(search))
+    return query
@@ -0,0 +1,36 @@
+import os
+import threading
+import time
+
+# Token bucket shared by everything that calls Gemini, sized to our API quota.
+# acquire() blocks the calling thread, so call it from the threadpool, not the event loop.
+
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+GEMINI_BURST = float(os.getenv("GEMINI_BURST", "5"))
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute, capacity):
+        # rate_per_minute <= 0 disables limiting
+        self.rate_per_second = rate_per_minute / 60
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate_per_second <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate_per_second
+            time.sleep(wait)
+
+
+gemini_rate_limiter = TokenBucket(GEMINI_REQUESTS_PER_MINUTE, GEMINI_BURST)
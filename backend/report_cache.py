@@ -0,0 +1,157 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+import anyio.from_thread
+from sqlalchemy.exc import IntegrityError
+from .database import AsyncSessionLocal
+from . import models
+
+# Content-addressed cache for generated AI reports.
+# Key = sha256(model name + whitespace-normalized prompt), so an evaluation with the
+# same inputs never pays for a second Gemini round-trip.
+# Tiers are checked in order; a hit in a slower tier is copied into the faster ones.
+# Runs in the worker threadpool (generate_evaluation_report and the report stream are
+# always called through run_in_threadpool / iterate_in_threadpool), so tiers are sync.
+# The table tier hands its queries back to the event loop on the API's async engine
+# rather than opening a second, sync connection pool.
+
+REPORT_CACHE_TIERS = os.getenv("REPORT_CACHE_TIERS", "memory,table")
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "1024"))
+REPORT_CACHE_TTL_SECONDS = int(os.getenv("REPORT_CACHE_TTL_SECONDS", "86400"))
+
+
+def cache_key(prompt, model_name):
+    normalized = " ".join(prompt.split())
+    return hashlib.sha256(f"{model_name}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+class MemoryTier:
+    name = "memory"
+
+    def __init__(self, max_entries=REPORT_CACHE_SIZE, ttl_seconds=REPORT_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, report)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, report = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return report
+
+    def set(self, key, report, model_name):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, report)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TableTier:
+    name = "table"
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def _get(self, key):
+        async with self.session_factory() as db:
+            entry = await db.get(models.ReportCacheEntry, key)
+            return entry.report if entry else None
+
+    async def _set(self, key, report, model_name):
+        async with self.session_factory() as db:
+            db.add(models.ReportCacheEntry(
+                key=key, model_name=model_name, report=report, created_at=datetime.utcnow()
+            ))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another worker cached the same prompt first
+                await db.rollback()
+
+    def get(self, key):
+        # Only from a threadpool worker: blocks this thread, not the event loop
+        return anyio.from_thread.run(self._get, key)
+
+    def set(self, key, report, model_name):
+        anyio.from_thread.run(self._set, key, report, model_name)
+
+
+class ReportCache:
+    def __init__(self, tiers):
+        self.tiers = tiers
+        self._lock = threading.Lock()
+        self.hits = {tier.name: 0 for tier in tiers}
+        self.misses = 0
+
+    def _count(self, tier_name=None):
+        with self._lock:
+            if tier_name is None:
+                self.misses += 1
+            else:
+                self.hits[tier_name] += 1
+
+    def get(self, key, model_name):
+        for index, tier in enumerate(self.tiers):
+            try:
+                report = tier.get(key)
+            except Exception as e:
+                print(f"⚠️ Report cache tier '{tier.name}' read failed: {e}")
+                continue
+            if report is not None:
+                self._count(tier.name)
+                for faster in self.tiers[:index]:
+                    faster.set(key, report, model_name)
+                return report
+        self._count()
+        return None
+
+    def set(self, key, report, model_name):
+        for tier in self.tiers:
+            try:
+                tier.set(key, report, model_name)
+            except Exception as e:
+                print(f"⚠️ Report cache tier '{tier.name}' write failed: {e}")
+
+    def get_or_generate(self, prompt, model_name, generate):
+        key = cache_key(prompt, model_name)
+        report = self.get(key, model_name)
+        if report is None:
+            report = generate(prompt)
+            self.set(key, report, model_name)
+        return report
+
+    def stats(self):
+        with self._lock:
+            hits = dict(self.hits)
+            misses = self.misses
+        lookups = sum(hits.values()) + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(sum(hits.values()) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def build_report_cache(tier_names=REPORT_CACHE_TIERS):
+    available = {"memory": MemoryTier, "table": TableTier}
+    tiers = []
+    for name in filter(None, (n.strip() for n in tier_names.split(","))):
+        if name not in available:
+            raise ValueError(f"Unknown report cache tier: {name}")
+        tiers.append(available[name]())
+    return ReportCache(tiers)
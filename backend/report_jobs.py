@@ -0,0 +1,338 @@
+import asyncio
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update, or_
+from .database import AsyncSessionLocal
+from . import ai_service
+from . import models
+from .etags import EVALUATIONS, bump_version
+
+# Background AI report generation.
+# submit_hr_review commits and enqueues; a small pool of asyncio workers claims jobs,
+# calls Gemini off the event loop and writes the report back, retrying with backoff.
+#
+# REPORT_QUEUE_BACKEND:
+#   memory - asyncio.Queue inside the process, for a single server process only: on start
+#            it treats every running report as left over from its own last run and
+#            queues it again (jobs are recovered from report_status on restart)
+#   table  - rows in report_jobs, safe to share between workers/processes; use this under
+#            uvicorn --workers N or several instances
+# Before generating, a worker claims the evaluation with a conditional UPDATE on
+# report_status and drops the job if something else got there first.
+
+REPORT_QUEUE_BACKEND = os.getenv("REPORT_QUEUE_BACKEND", "memory")
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_MAX_ATTEMPTS = int(os.getenv("REPORT_MAX_ATTEMPTS", "3"))
+REPORT_RETRY_BASE_SECONDS = float(os.getenv("REPORT_RETRY_BASE_SECONDS", "2"))
+REPORT_JOB_POLL_SECONDS = float(os.getenv("REPORT_JOB_POLL_SECONDS", "1"))
+# A "running" table job not finished within this window is assumed lost and reclaimed
+REPORT_JOB_LEASE_SECONDS = int(os.getenv("REPORT_JOB_LEASE_SECONDS", "300"))
+
+PENDING_REPORT_STATUSES = ["queued", "running"]
+
+
+@dataclass
+class Job:
+    evaluation_id: int
+    attempts: int = 0  # including the attempt currently being made
+    job_id: int = None
+
+
+async def _pending_evaluation_ids(session_factory):
+    async with session_factory() as db:
+        return (await db.execute(
+            select(models.Evaluation.id).filter(
+                models.Evaluation.report_status.in_(PENDING_REPORT_STATUSES)
+            )
+        )).scalars().all()
+
+
+class InProcessQueue:
+    # report_status values a worker may claim an evaluation from
+    claimable = ["queued"]
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._queue = None
+        self._waiting = set()  # evaluation ids sitting in the queue, to drop duplicates
+
+    def open(self):
+        # Bound to the running event loop, so created on start rather than at import
+        self._queue = asyncio.Queue()
+        self._waiting = set()
+
+    def _put(self, job):
+        if job.evaluation_id in self._waiting:
+            return
+        self._waiting.add(job.evaluation_id)
+        self._queue.put_nowait(job)
+
+    async def recover(self):
+        # Single process: a report still running belongs to this process's last run
+        async with self.session_factory() as db:
+            await db.execute(
+                update(models.Evaluation)
+                .filter(models.Evaluation.report_status == "running")
+                .values(report_status="queued")
+            )
+            await db.commit()
+        for evaluation_id in await _pending_evaluation_ids(self.session_factory):
+            self._put(Job(evaluation_id))
+
+    async def enqueue(self, evaluation_id):
+        self._put(Job(evaluation_id))
+
+    async def enqueue_many(self, evaluation_ids):
+        for evaluation_id in evaluation_ids:
+            self._put(Job(evaluation_id))
+
+    async def claim(self):
+        job = await self._queue.get()
+        self._waiting.discard(job.evaluation_id)
+        job.attempts += 1
+        return job
+
+    async def complete(self, job):
+        pass
+
+    async def retry(self, job, error, delay):
+        asyncio.get_running_loop().call_later(delay, self._put, job)
+
+    async def fail(self, job, error):
+        pass
+
+
+class TableQueue:
+    # The report_jobs row is already exclusive; a job reclaimed after its lease ran out
+    # finds the evaluation still marked running by the worker that lost it
+    claimable = PENDING_REPORT_STATUSES
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        poll_seconds=REPORT_JOB_POLL_SECONDS,
+        lease_seconds=REPORT_JOB_LEASE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+
+    def open(self):
+        pass
+
+    async def recover(self):
+        # Evaluations marked pending whose job row never made it (crash between commit and enqueue)
+        await self.enqueue_many(await _pending_evaluation_ids(self.session_factory))
+
+    async def enqueue_many(self, evaluation_ids):
+        # One lookup and one commit for the lot; ids that already have a pending job are skipped
+        if not evaluation_ids:
+            return
+        async with self.session_factory() as db:
+            queued = set((await db.execute(
+                select(models.ReportJob.evaluation_id).filter(
+                    models.ReportJob.evaluation_id.in_(evaluation_ids),
+                    models.ReportJob.status.in_(PENDING_REPORT_STATUSES),
+                )
+            )).scalars().all())
+            db.add_all([models.ReportJob(evaluation_id=i) for i in evaluation_ids if i not in queued])
+            await db.commit()
+
+    async def enqueue(self, evaluation_id):
+        async with self.session_factory() as db:
+            already_queued = (await db.execute(
+                select(models.ReportJob.id).filter(
+                    models.ReportJob.evaluation_id == evaluation_id,
+                    models.ReportJob.status.in_(PENDING_REPORT_STATUSES),
+                ).limit(1)
+            )).first()
+            if already_queued is None:
+                db.add(models.ReportJob(evaluation_id=evaluation_id))
+                await db.commit()
+
+    async def claim(self):
+        while True:
+            job = await self._try_claim()
+            if job is not None:
+                return job
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _try_claim(self):
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.lease_seconds)
+        async with self.session_factory() as db:
+            candidate = (await db.execute(
+                select(models.ReportJob.id, models.ReportJob.evaluation_id, models.ReportJob.attempts)
+                .filter(or_(
+                    (models.ReportJob.status == "queued") & (models.ReportJob.run_after <= now),
+                    (models.ReportJob.status == "running") & (models.ReportJob.claimed_at < stale),
+                ))
+                .order_by(models.ReportJob.run_after)
+                .limit(1)
+            )).first()
+            if candidate is None:
+                return None
+
+            # Conditional update: only one worker (in any process) wins the row
+            result = await db.execute(
+                update(models.ReportJob)
+                .filter(
+                    models.ReportJob.id == candidate.id,
+                    models.ReportJob.attempts == candidate.attempts,
+                )
+                .values(status="running", claimed_at=now, attempts=candidate.attempts + 1)
+            )
+            await db.commit()
+            if result.rowcount != 1:
+                return None
+
+        return Job(candidate.evaluation_id, attempts=candidate.attempts + 1, job_id=candidate.id)
+
+    async def _set(self, job, **values):
+        async with self.session_factory() as db:
+            await db.execute(
+                update(models.ReportJob).filter(models.ReportJob.id == job.job_id).values(**values)
+            )
+            await db.commit()
+
+    async def complete(self, job):
+        await self._set(job, status="done", last_error=None)
+
+    async def retry(self, job, error, delay):
+        run_after = datetime.utcnow() + timedelta(seconds=delay)
+        await self._set(job, status="queued", run_after=run_after, last_error=error)
+
+    async def fail(self, job, error):
+        await self._set(job, status="failed", last_error=error)
+
+
+def build_queue(backend=REPORT_QUEUE_BACKEND, session_factory=AsyncSessionLocal):
+    if backend == "memory":
+        return InProcessQueue(session_factory)
+    if backend == "table":
+        return TableQueue(session_factory)
+    raise ValueError(f"Unknown REPORT_QUEUE_BACKEND: {backend}")
+
+
+class ReportWorkerPool:
+    def __init__(
+        self,
+        queue,
+        generate=None,
+        concurrency=REPORT_WORKERS,
+        max_attempts=REPORT_MAX_ATTEMPTS,
+        retry_base_seconds=REPORT_RETRY_BASE_SECONDS,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.queue = queue
+        # None means ai_service.generate_evaluation_report, looked up per job so it can be swapped
+        self.generate = generate
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.session_factory = session_factory
+        self._tasks = []
+        self._started = False
+
+    async def start(self):
+        # Nothing awaits between the check and the flag, so concurrent callers can't start twice
+        if self._started:
+            return
+        self._started = True
+        self.queue.open()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        await self.queue.recover()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._started = False
+
+    async def enqueue(self, evaluation_id):
+        # Serverless runtimes may never fire startup events, so start on first use
+        await self.start()
+        await self.queue.enqueue(evaluation_id)
+
+    async def enqueue_many(self, evaluation_ids):
+        await self.start()
+        await self.queue.enqueue_many(evaluation_ids)
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.claim()
+            try:
+                await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"🔥 Report worker error on evaluation {job.evaluation_id}: {e}")
+
+    def _retry_delay(self, attempts):
+        # Exponential backoff with a little jitter so retries don't stampede the Gemini quota
+        return self.retry_base_seconds * (2 ** (attempts - 1)) * (1 + random.random() * 0.25)
+
+    async def _process(self, job):
+        generate = self.generate or ai_service.generate_evaluation_report
+
+        async with self.session_factory() as db:
+            evaluation = await db.get(models.Evaluation, job.evaluation_id)
+            if evaluation is None:
+                await self.queue.complete(job)
+                return
+
+            if evaluation.report:
+                # Already produced, e.g. by a manual /generate-report call
+                evaluation.report_status = "done"
+                await bump_version(db, EVALUATIONS)
+                await db.commit()
+                await self.queue.complete(job)
+                return
+
+            claimed = await db.execute(
+                update(models.Evaluation)
+                .filter(
+                    models.Evaluation.id == job.evaluation_id,
+                    models.Evaluation.report_status.in_(self.queue.claimable),
+                )
+                .values(report_status="running")
+            )
+            if claimed.rowcount != 1:
+                # Another process has it, or it was finished or reset since it was queued
+                await db.rollback()
+                await self.queue.complete(job)
+                return
+            await bump_version(db, EVALUATIONS)
+            await db.commit()
+
+            try:
+                report = await run_in_threadpool(generate, evaluation)
+            except Exception as e:
+                if job.attempts < self.max_attempts:
+                    delay = self._retry_delay(job.attempts)
+                    print(f"⚠️ AI report for evaluation {job.evaluation_id} failed (attempt {job.attempts}), retrying in {delay:.1f}s: {e}")
+                    evaluation.report_status = "queued"
+                    await bump_version(db, EVALUATIONS)
+                    await db.commit()
+                    await self.queue.retry(job, str(e), delay)
+                else:
+                    print(f"AI Report Generation failed for evaluation {job.evaluation_id}: {e}")
+                    evaluation.report_status = "failed"
+                    await bump_version(db, EVALUATIONS)
+                    await db.commit()
+                    await self.queue.fail(job, str(e))
+                return
+
+            evaluation.report = report
+            evaluation.report_status = "done"
+            await bump_version(db, EVALUATIONS)
+            await db.commit()
+
+        await self.queue.complete(job)
+
+
+report_workers = ReportWorkerPool(build_queue())
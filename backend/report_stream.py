@@ -0,0 +1,61 @@
+import json
+from sqlalchemy import or_, update
+from starlette.concurrency import iterate_in_threadpool
+from .database import AsyncSessionLocal
+from . import ai_service
+from . import models
+from .etags import EVALUATIONS, bump_version
+
+# POST /generate-report/{id}/stream: the AI report as Server-Sent Events, forwarded
+# as Gemini produces it instead of after the whole completion.
+#   event: chunk   data: {"text": "..."}        one or more, in order
+#   event: done    data: {"report_status": "done", "length": n}
+#   event: error   data: {"detail": "..."}
+# The assembled report is saved to Evaluation.report only after the last chunk, so a
+# dropped connection leaves the evaluation as it was. The save only fills an empty
+# report: if a background job finished first, its report is the one kept.
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stops nginx-style proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_report(evaluation, session_factory=AsyncSessionLocal):
+    if evaluation.report:
+        yield sse("chunk", {"text": evaluation.report})
+        yield sse("done", {"report_status": "done", "length": len(evaluation.report)})
+        return
+
+    parts = []
+    try:
+        # The Gemini stream is a blocking iterator; each next() runs in the threadpool
+        async for text in iterate_in_threadpool(ai_service.stream_evaluation_report(evaluation)):
+            parts.append(text)
+            yield sse("chunk", {"text": text})
+    except Exception as e:
+        print(f"AI Report Generation failed for evaluation {evaluation.id}: {e}")
+        yield sse("error", {"detail": str(e)})
+        return
+
+    report = "".join(parts)
+    async with session_factory() as db:
+        saved = (await db.execute(
+            update(models.Evaluation)
+            .where(
+                models.Evaluation.id == evaluation.id,
+                or_(models.Evaluation.report.is_(None), models.Evaluation.report == ""),
+            )
+            .values(report=report, report_status="done")
+            .returning(models.Evaluation.id)
+        )).first()
+        if saved:
+            await bump_version(db, EVALUATIONS)
+        await db.commit()
+
+    yield sse("done", {"report_status": "done", "length": len(report)})
@@ -0,0 +1,197 @@
+import os
+from sqlalchemy import and_, bindparam, column, func, literal, literal_column, or_, select, table, text
+from .database import dialect_name
+from . import models
+
+# Search index behind the dashboard search box.
+# One row per evaluation holding the intern and manager names/emails and all comment text:
+#   SQLite   - FTS5 table with the trigram tokenizer (substring matches, bm25 ranking)
+#   Postgres - plain table with a pg_trgm GIN index for substring matches and a generated
+#              tsvector + GIN index for word matches (ts_rank ranking)
+# Rows are rewritten in the same transaction as the evaluation/user write that changes
+# them (sync_evaluations / sync_user), and rebuilt in full by the migration or
+# `python -m backend.search --rebuild`.
+# SEARCH_BACKEND=like keeps the old LIKE scan over the email columns.
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "fts")
+SEARCH_TABLE = "evaluation_search"
+
+# The trigram tokenizer can't use its index for terms shorter than this
+MIN_TRIGRAM_LENGTH = 3
+
+IS_POSTGRES = dialect_name() == "postgresql"
+
+if IS_POSTGRES:
+    search_table = table(SEARCH_TABLE, column("evaluation_id"), column("document"), column("document_tsv"))
+else:
+    search_table = table(SEARCH_TABLE, column("rowid"), column("people"), column("comments"))
+
+
+def create_search_table(conn):
+    if conn.dialect.name == "postgresql":
+        try:
+            with conn.begin_nested():
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            has_trgm = True
+        except Exception as e:
+            # Fragment search still works without the extension, just unindexed
+            print(f"⚠️ pg_trgm unavailable, skipping trigram index: {e}")
+            has_trgm = False
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+            "evaluation_id INTEGER PRIMARY KEY, "
+            "document TEXT NOT NULL, "
+            "document_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED)"
+        ))
+        if has_trgm:
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_trgm ON {SEARCH_TABLE} "
+                "USING gin (document gin_trgm_ops)"
+            ))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_tsv ON {SEARCH_TABLE} USING gin (document_tsv)"
+        ))
+    else:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+            "USING fts5(people, comments, tokenize='trigram')"
+        ))
+
+
+def _sync_statements(conn_dialect, where, params):
+    # Delete-then-insert so one statement pair serves inserts, updates and rebuilds
+    people = (
+        "COALESCE(iu.name, '') || ' ' || e.intern_id || ' ' || "
+        "COALESCE(mu.name, '') || ' ' || e.manager_id"
+    )
+    comments = (
+        "COALESCE(e.manager_comment, '') || ' ' || "
+        "COALESCE(e.intern_comment, '') || ' ' || COALESCE(e.hr_comment, '')"
+    )
+    source = (
+        "FROM evaluations e "
+        "LEFT JOIN users iu ON iu.email = e.intern_id "
+        "LEFT JOIN users mu ON mu.email = e.manager_id"
+    )
+    filtered = f"{source} WHERE {where}" if where else source
+
+    if conn_dialect == "postgresql":
+        key = "evaluation_id"
+        insert = (
+            f"INSERT INTO {SEARCH_TABLE} (evaluation_id, document) "
+            f"SELECT e.id, {people} || ' ' || {comments} {filtered}"
+        )
+    else:
+        key = "rowid"
+        insert = (
+            f"INSERT INTO {SEARCH_TABLE} (rowid, people, comments) "
+            f"SELECT e.id, {people}, {comments} {filtered}"
+        )
+
+    if where:
+        delete = f"DELETE FROM {SEARCH_TABLE} WHERE {key} IN (SELECT e.id FROM evaluations e WHERE {where})"
+    else:
+        delete = f"DELETE FROM {SEARCH_TABLE}"
+
+    statements = [text(delete), text(insert)]
+    if "ids" in params:
+        statements = [s.bindparams(bindparam("ids", expanding=True)) for s in statements]
+    return [(s, params) for s in statements]
+
+
+async def sync_evaluations(db, evaluation_ids):
+    # Call after flush and before commit so the index changes with the evaluation
+    if SEARCH_BACKEND != "fts" or not evaluation_ids:
+        return
+    dialect = db.bind.dialect.name
+    for statement, params in _sync_statements(dialect, "e.id IN :ids", {"ids": list(evaluation_ids)}):
+        await db.execute(statement, params)
+
+
+async def sync_user(db, email):
+    # A (re)registered user's name shows up in every evaluation that references their email
+    if SEARCH_BACKEND != "fts":
+        return
+    dialect = db.bind.dialect.name
+    where = "e.intern_id = :email OR e.manager_id = :email"
+    for statement, params in _sync_statements(dialect, where, {"email": email}):
+        await db.execute(statement, params)
+
+
+def rebuild(conn):
+    for statement, params in _sync_statements(conn.dialect.name, None, {}):
+        conn.execute(statement, params)
+
+
+def _like(term):
+    # Pre-index behaviour: unindexable LIKE '%term%' over the email columns only
+    return or_(models.Evaluation.intern_id.contains(term), models.Evaluation.manager_id.contains(term))
+
+
+def matches(term, ranked=True):
+    # Evaluation ids matching every word of term, optionally with a rank (lower is better)
+    words = term.split()
+    if not words:
+        return None
+
+    if IS_POSTGRES:
+        query = func.websearch_to_tsquery("simple", term)
+        conditions = [or_(
+            # Whole words via the tsvector, fragments of emails and names via trigrams
+            search_table.c.document_tsv.op("@@")(query),
+            and_(*[search_table.c.document.icontains(w, autoescape=True) for w in words]),
+        )]
+        key = search_table.c.evaluation_id
+        rank = -func.ts_rank(search_table.c.document_tsv, query)
+    else:
+        long_words = [w for w in words if len(w) >= MIN_TRIGRAM_LENGTH]
+        short_words = [w for w in words if len(w) < MIN_TRIGRAM_LENGTH]
+        conditions = []
+        rank = literal(0)
+        if long_words:
+            phrase = " AND ".join('"' + w.replace('"', '""') + '"' for w in long_words)
+            conditions.append(literal_column(SEARCH_TABLE).op("MATCH")(phrase))
+            rank = func.bm25(literal_column(SEARCH_TABLE))
+        for w in short_words:
+            conditions.append(or_(
+                search_table.c.people.contains(w, autoescape=True),
+                search_table.c.comments.contains(w, autoescape=True),
+            ))
+        key = search_table.c.rowid
+
+    columns = [key.label("evaluation_id")]
+    if ranked:
+        columns.append(rank.label("rank"))
+    return select(*columns).where(*conditions)
+
+
+def search_filter(term):
+    if SEARCH_BACKEND != "fts":
+        return _like(term)
+    matching = matches(term, ranked=False)
+    if matching is None:
+        return literal(True)
+    return models.Evaluation.id.in_(matching)
+
+
+def order_by_relevance(query, term, *tie_breakers):
+    # Replaces the listing order with best match first (LIKE fallback has no rank)
+    matching = matches(term) if SEARCH_BACKEND == "fts" else None
+    if matching is None:
+        return query.order_by(*tie_breakers)
+    ranked = matching.subquery()
+    return query.join(ranked, ranked.c.evaluation_id == models.Evaluation.id).order_by(ranked.c.rank, *tie_breakers)
+
+
+if __name__ == "__main__":
+    import sys
+    from .database import engine
+
+    if "--rebuild" not in sys.argv:
+        print("Usage: python -m backend.search --rebuild")
+        sys.exit(1)
+
+    with engine.begin() as conn:
+        rebuild(conn)
+        total = conn.execute(select(func.count()).select_from(search_table)).scalar()
+    print(f"✅ Rebuilt {SEARCH_TABLE}: {total} evaluations indexed")
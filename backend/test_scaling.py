@@ -1,28 +0,0 @@
-import sqlite3
-import os
-
-db_path = "ims.db"
-
-if not os.path.exists(db_path):
-    print(f"Error: {db_path} not found.")
-    exit(1)
-
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-# Check columns in users table
-cursor.execute("PRAGMA table_info(users)")
-columns = [row[1] for row in cursor.fetchall()]
-
-if "is_active" not in columns:
-    print("Adding 'is_active' column to 'users' table...")
-    try:
-        cursor.execute("ALTER TABLE users ADD COLUMN is_active INTEGER DEFAULT 1")
-        conn.commit()
-        print("Column added successfully.")
-    except Exception as e:
-        print(f"Error adding column: {e}")
-else:
-    print("'is_active' column already exists.")
-
-conn.close()
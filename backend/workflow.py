@@ -0,0 +1,104 @@
+import os
+from types import SimpleNamespace
+from fastapi import HTTPException
+from sqlalchemy import case, select, update
+from . import analytics
+from . import models
+from .etags import EVALUATIONS, bump_version
+from .search import sync_evaluations
+
+# Workflow transitions: pending_intern -> pending_hr -> completed.
+# Each transition is one UPDATE ... WHERE id IN (...) AND status = <from> RETURNING, so
+# the state check and the write are a single statement: of two racing submissions the
+# row lock lets exactly one match, and the other updates nothing. Only a transition
+# that updated nothing looks the row up again, to tell 404 from 409.
+# The columns a transition sets are empty before it (nothing else writes them), so the
+# evaluation's analytics contribution before the change is the returned row with those
+# columns cleared and the old status.
+
+INTERN_FEEDBACK = ("pending_intern", "pending_hr")
+HR_REVIEW = ("pending_hr", "completed")
+
+HR_REVIEW_BATCH_MAX = int(os.getenv("HR_REVIEW_BATCH_MAX", "1000"))
+
+RETURNING_COLUMNS = [
+    models.Evaluation.id,
+    models.Evaluation.manager_id,
+    models.Evaluation.rating,
+    models.Evaluation.hr_rating_adjustment,
+    models.Evaluation.status,
+    models.Evaluation.created_at,
+    models.Evaluation.completed_at,
+]
+
+
+def _before(row, from_status, values):
+    fields = dict(row._mapping)
+    fields.update({name: None for name in values if name in fields})
+    fields["status"] = from_status
+    return SimpleNamespace(**fields)
+
+
+async def transition(db, evaluation_ids, states, values, *conditions):
+    # Moves whichever of evaluation_ids are in states[0] to states[1], with the search
+    # index, analytics and data version updated in the same transaction. Returns the
+    # updated rows (RETURNING_COLUMNS); the caller commits.
+    from_status, to_status = states
+    rows = (await db.execute(
+        update(models.Evaluation)
+        .where(models.Evaluation.id.in_(evaluation_ids), models.Evaluation.status == from_status, *conditions)
+        .values(status=to_status, **values)
+        .returning(*RETURNING_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )).all()
+    if rows:
+        await sync_evaluations(db, [row.id for row in rows])
+        await analytics.record(
+            db,
+            added=[analytics.contribution(row) for row in rows],
+            removed=[analytics.contribution(_before(row, from_status, values)) for row in rows],
+        )
+        await bump_version(db, EVALUATIONS)
+    return rows
+
+
+async def failures(db, evaluation_ids, *conditions):
+    # {id: (status code, message)} for ids a transition did not update: 404 when the
+    # evaluation doesn't exist (or isn't the caller's), 409 when it is in another state
+    if not evaluation_ids:
+        return {}
+    statuses = dict((await db.execute(
+        select(models.Evaluation.id, models.Evaluation.status)
+        .filter(models.Evaluation.id.in_(evaluation_ids), *conditions)
+    )).all())
+    return {
+        evaluation_id: (409, f"Invalid workflow state: evaluation is {statuses[evaluation_id]}")
+        if evaluation_id in statuses else (404, "Evaluation not found")
+        for evaluation_id in evaluation_ids
+    }
+
+
+async def transition_one(db, evaluation_id, states, values, *conditions):
+    rows = await transition(db, [evaluation_id], states, values, *conditions)
+    if not rows:
+        status_code, detail = (await failures(db, [evaluation_id], *conditions))[evaluation_id]
+        raise HTTPException(status_code=status_code, detail=detail)
+    return rows[0]
+
+
+def hr_review_values(reviews, completed_at):
+    # UPDATE values completing several reviews at once; comment and adjustment are
+    # picked per row with CASE id, so the batch is still one statement
+    if len(reviews) == 1:
+        comments = reviews[0].comment
+        adjustments = reviews[0].rating_adjustment
+    else:
+        comments = case({r.evaluation_id: r.comment for r in reviews}, value=models.Evaluation.id)
+        adjustments = case({r.evaluation_id: r.rating_adjustment for r in reviews}, value=models.Evaluation.id)
+    return {
+        "hr_comment": comments,
+        "hr_rating_adjustment": adjustments,
+        "completed_at": completed_at,
+        # The AI report is generated in the background once the review is committed
+        "report_status": "queued",
+    }
@@ -1,8 +1,8 @@
 import { useEffect, useState } from "react";
-import api from "../services/api";
+import api, { streamReport } from "../services/api";
 import StepIndicator from "../components/StepIndicator";
 import { useToast } from "../components/ToastContext";
-import { downloadEvaluationPDF } from "../services/pdfService";
+import { downloadEvaluationPDF, downloadReportsZip } from "../services/pdfService";
 
 function HRDashboard() {
     const [evaluations, setEvaluations] = useState<any[]>([]);
@@ -10,27 +10,40 @@ function HRDashboard() {
     const [search, setSearch] = useState("");
     const [statusFilter, setStatusFilter] = useState("");
     const [page, setPage] = useState(0);
+    const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const limit = 10;
+    const [details, setDetails] = useState<{ [key: number]: any }>({});
+    // Report text while it is still streaming in from /generate-report/{id}/stream
+    const [streamedReports, setStreamedReports] = useState<{ [key: number]: string }>({});
     const [users, setUsers] = useState<any[]>([]);
+    const [usersTotal, setUsersTotal] = useState(0);
+    const [usersSkip, setUsersSkip] = useState(0);
+    const usersLimit = 20;
     const [activeTab, setActiveTab] = useState<"evaluations" | "users">("evaluations");
     const [hrComment, setHrComment] = useState("");
     const [ratingAdjustment, setRatingAdjustment] = useState(0);
     const [loading, setLoading] = useState(false);
     const { showToast } = useToast();
 
-    const fetchEvaluations = async () => {
+    const fetchEvaluations = async (cursor: string | undefined = cursors[page]) => {
         setLoading(true);
         try {
             const res = await api.get("/hr/evaluations", {
                 params: {
                     search: search || undefined,
                     status: statusFilter || undefined,
-                    skip: page * limit,
-                    limit: limit
+                    cursor: cursor,
+                    limit: limit,
+                    // The total only changes the page count, so skip the COUNT after the first page
+                    include_total: cursor === undefined
                 }
             });
             setEvaluations(res.data.evaluations || []);
-            setTotal(res.data.total || 0);
+            if (res.data.total !== null && res.data.total !== undefined) {
+                setTotal(res.data.total);
+            }
+            setNextCursor(res.data.next_cursor || null);
         } catch (err) {
             console.error(err);
             showToast("Failed to load evaluations", "error");
@@ -39,10 +52,11 @@ function HRDashboard() {
         }
     };
 
-    const fetchUsers = async () => {
+    const fetchUsers = async (skip: number = usersSkip) => {
         try {
-            const res = await api.get("/hr/users");
-            setUsers(res.data || []);
+            const res = await api.get("/hr/users", { params: { skip, limit: usersLimit } });
+            setUsers(res.data.users || []);
+            setUsersTotal(res.data.total || 0);
         } catch (err) {
             console.error(err);
         }
@@ -50,13 +64,82 @@ function HRDashboard() {
 
     useEffect(() => {
         fetchEvaluations();
-        fetchUsers();
     }, [page, statusFilter]);
 
+    useEffect(() => {
+        fetchUsers();
+    }, [usersSkip]);
+
     const handleSearch = (e: React.FormEvent) => {
         e.preventDefault();
+        resetPaging();
+        fetchEvaluations(undefined);
+    };
+
+    // Keyset pagination: cursors[n] fetches page n, so Previous can step back
+    const goToNextPage = () => {
+        if (!nextCursor) return;
+        setCursors([...cursors.slice(0, page + 1), nextCursor]);
+        setPage(page + 1);
+    };
+
+    const resetPaging = () => {
+        setCursors([undefined]);
         setPage(0);
-        fetchEvaluations();
+    };
+
+    // Full export with the current filters, streamed by the server as CSV
+    const exportEvaluations = async () => {
+        try {
+            const res = await api.get("/hr/evaluations/export", {
+                params: {
+                    search: search || undefined,
+                    status: statusFilter || undefined,
+                    format: "csv"
+                },
+                responseType: "blob"
+            });
+            const url = URL.createObjectURL(res.data);
+            const link = document.createElement("a");
+            link.href = url;
+            link.download = "evaluations.csv";
+            link.click();
+            URL.revokeObjectURL(url);
+        } catch (err) {
+            console.error(err);
+            showToast("Failed to export evaluations", "error");
+        }
+    };
+
+    // PDFs of every completed evaluation matching the search, rendered server-side
+    const exportReports = async () => {
+        try {
+            await downloadReportsZip({ search: search || undefined });
+        } catch (err) {
+            console.error(err);
+            showToast("Failed to export reports", "error");
+        }
+    };
+
+    // Listings carry comment previews only; the full record (comments, AI report) is fetched per card
+    const loadDetails = async (evaluationId: number) => {
+        try {
+            const res = await api.get(`/evaluations/${evaluationId}`);
+            setDetails((prev) => ({ ...prev, [evaluationId]: res.data }));
+            return res.data;
+        } catch (err) {
+            console.error(err);
+            showToast("Failed to load evaluation", "error");
+        }
+    };
+
+    const downloadPDF = async (evaluationId: number) => {
+        try {
+            await downloadEvaluationPDF(evaluationId);
+        } catch (err) {
+            console.error(err);
+            showToast("Failed to download PDF", "error");
+        }
     };
 
     const toggleUserStatus = async (email: string) => {
@@ -82,27 +165,55 @@ function HRDashboard() {
                 rating_adjustment: ratingAdjustment,
             });
 
-            showToast("Review Submitted & AI Report Generated", "success");
+            showToast("Review Submitted. AI Report is being generated...", "success");
             setHrComment("");
             setRatingAdjustment(0);
             fetchEvaluations();
-        } catch (err) {
+            pollReportStatus(evaluationId);
+        } catch (err: any) {
             console.error(err);
-            showToast("Error submitting review", "error");
+            showToast(err.response?.data?.detail || "Error submitting review", "error");
+            // 409: someone else already moved it on; show the current state
+            if (err.response?.status === 409) fetchEvaluations();
         } finally {
             setLoading(false);
         }
     };
 
+    // Reports are produced by a background job; refresh once it finishes
+    const pollReportStatus = async (evaluationId: number) => {
+        for (let attempt = 0; attempt < 30; attempt++) {
+            await new Promise((resolve) => setTimeout(resolve, 2000));
+            try {
+                const res = await api.get(`/evaluations/${evaluationId}/report-status`);
+                if (res.data.report_status === "done" || res.data.report_status === "failed") {
+                    fetchEvaluations();
+                    return;
+                }
+            } catch (err) {
+                console.error(err);
+                return;
+            }
+        }
+    };
+
     const generateReport = async (evaluationId: number) => {
         setLoading(true);
         try {
-            await api.post(`/generate-report/${evaluationId}`);
+            await streamReport(evaluationId, (text) => {
+                setStreamedReports((prev) => ({ ...prev, [evaluationId]: text }));
+            });
             showToast("AI Report Generated Successfully", "success");
+            await loadDetails(evaluationId);
             fetchEvaluations();
-        } catch (err) {
+        } catch (err: any) {
             console.error(err);
-            showToast("Failed to generate AI report", "error");
+            if (err.status === 409) {
+                showToast(err.message, "error");
+                pollReportStatus(evaluationId);
+            } else {
+                showToast("Failed to generate AI report", "error");
+            }
         } finally {
             setLoading(false);
         }
@@ -169,13 +280,15 @@ function HRDashboard() {
                         </form>
                         <select
                             value={statusFilter}
-                            onChange={(e) => { setStatusFilter(e.target.value); setPage(0); }}
+                            onChange={(e) => { setStatusFilter(e.target.value); resetPaging(); }}
                             style={{ width: "200px" }}
                         >
                             <option value="">All Statuses</option>
                             <option value="pending_hr">Pending HR</option>
                             <option value="completed">Completed</option>
                         </select>
+                        <button type="button" className="secondary" onClick={exportEvaluations}>Export CSV</button>
+                        <button type="button" className="secondary" onClick={exportReports}>Export PDFs (ZIP)</button>
                     </div>
 
                     <div style={{ display: "grid", gap: "2rem" }}>
@@ -191,7 +304,7 @@ function HRDashboard() {
                                     </span>
                                 </div>
 
-                                <StepIndicator status={evalItem.status} hasReport={!!evalItem.report} />
+                                <StepIndicator status={evalItem.status} hasReport={evalItem.has_report} />
 
                                 <div style={{ display: "grid", gridTemplateColumns: "repeat(3, 1fr)", gap: "1.5rem", marginBottom: "2rem", padding: "1.5rem", background: "rgba(255,255,255,0.03)", borderRadius: "12px" }}>
                                     <div>
@@ -200,11 +313,20 @@ function HRDashboard() {
                                     </div>
                                     <div style={{ gridColumn: "span 2" }}>
                                         <label>Manager Comment</label>
-                                        <p style={{ fontSize: "0.9rem", color: "var(--text-primary)" }}>{evalItem.manager_comment}</p>
+                                        <p style={{ fontSize: "0.9rem", color: "var(--text-primary)" }}>
+                                            {details[evalItem.id]?.manager_comment ?? evalItem.manager_comment_preview}
+                                        </p>
                                     </div>
                                     <div style={{ gridColumn: "span 3", borderTop: "1px solid var(--border-glass)", paddingTop: "1rem" }}>
                                         <label>Intern Comment</label>
-                                        <p style={{ fontSize: "0.9rem", color: "var(--text-primary)" }}>{evalItem.intern_comment || "No comment provided."}</p>
+                                        <p style={{ fontSize: "0.9rem", color: "var(--text-primary)" }}>
+                                            {(details[evalItem.id] ? details[evalItem.id].intern_comment : evalItem.intern_comment_preview) || "No comment provided."}
+                                        </p>
+                                        {!details[evalItem.id] && (evalItem.manager_comment_preview.length >= 200 || (evalItem.intern_comment_preview || "").length >= 200) && (
+                                            <button onClick={() => loadDetails(evalItem.id)} className="secondary" style={{ padding: "4px 10px", fontSize: "0.8rem" }}>
+                                                Show full comments
+                                            </button>
+                                        )}
                                     </div>
                                 </div>
 
@@ -243,22 +365,41 @@ function HRDashboard() {
 
                                 {evalItem.status === "completed" && (
                                     <div style={{ borderTop: "1px solid var(--border-glass)", paddingTop: "1.5rem" }}>
-                                        {evalItem.report ? (
+                                        {evalItem.has_report ? (
                                             <>
-                                                <div style={{ background: "rgba(0,0,0,0.2)", padding: "1.5rem", borderRadius: "12px", marginBottom: "1rem" }}>
-                                                    <h4 style={{ color: "var(--accent)", marginBottom: "0.5rem" }}>Final AI Report</h4>
-                                                    <div style={{ whiteSpace: "pre-wrap", fontSize: "0.9rem", color: "var(--text-secondary)" }}>
-                                                        {evalItem.report}
+                                                {details[evalItem.id]?.report ? (
+                                                    <div style={{ background: "rgba(0,0,0,0.2)", padding: "1.5rem", borderRadius: "12px", marginBottom: "1rem" }}>
+                                                        <h4 style={{ color: "var(--accent)", marginBottom: "0.5rem" }}>Final AI Report</h4>
+                                                        <div style={{ whiteSpace: "pre-wrap", fontSize: "0.9rem", color: "var(--text-secondary)" }}>
+                                                            {details[evalItem.id].report}
+                                                        </div>
                                                     </div>
-                                                </div>
+                                                ) : (
+                                                    <button onClick={() => loadDetails(evalItem.id)} className="secondary" style={{ width: "100%", marginBottom: "1rem" }}>
+                                                        View AI Report
+                                                    </button>
+                                                )}
                                                 <button
-                                                    onClick={() => downloadEvaluationPDF(evalItem)}
+                                                    onClick={() => downloadPDF(evalItem.id)}
                                                     className="secondary"
                                                     style={{ width: "100%" }}
                                                 >
                                                     Download Branded PDF
                                                 </button>
                                             </>
+                                        ) : streamedReports[evalItem.id] ? (
+                                            <div style={{ background: "rgba(0,0,0,0.2)", padding: "1.5rem", borderRadius: "12px" }}>
+                                                <h4 style={{ color: "var(--accent)", marginBottom: "0.5rem" }}>Final AI Report</h4>
+                                                <div style={{ whiteSpace: "pre-wrap", fontSize: "0.9rem", color: "var(--text-secondary)" }}>
+                                                    {streamedReports[evalItem.id]}
+                                                </div>
+                                            </div>
+                                        ) : evalItem.report_status === "queued" || evalItem.report_status === "running" ? (
+                                            <div style={{ textAlign: "center", padding: "1rem", background: "rgba(255,255,255,0.03)", borderRadius: "8px" }}>
+                                                <p style={{ color: "var(--text-secondary)", fontSize: "0.9rem" }}>
+                                                    ⏳ AI Report is being generated...
+                                                </p>
+                                            </div>
                                         ) : (
                                             <div style={{ textAlign: "center", padding: "1rem", background: "rgba(255, 165, 0, 0.1)", borderRadius: "8px" }}>
                                                 <p style={{ color: "#ffa500", marginBottom: "1rem", fontSize: "0.9rem" }}>
@@ -284,7 +425,7 @@ function HRDashboard() {
                         <div style={{ display: "flex", justifyContent: "center", gap: "1rem", marginTop: "2rem" }}>
                             <button className="secondary" disabled={page === 0} onClick={() => setPage(page - 1)}>Previous</button>
                             <span style={{ alignSelf: "center" }}>Page {page + 1} of {Math.ceil(total / limit)}</span>
-                            <button className="secondary" disabled={(page + 1) * limit >= total} onClick={() => setPage(page + 1)}>Next</button>
+                            <button className="secondary" disabled={!nextCursor} onClick={goToNextPage}>Next</button>
                         </div>
                     )}
                 </section>
@@ -333,6 +474,13 @@ function HRDashboard() {
                             ))}
                         </tbody>
                     </table>
+                    {usersTotal > usersLimit && (
+                        <div style={{ display: "flex", justifyContent: "center", gap: "1rem", marginTop: "1.5rem" }}>
+                            <button className="secondary" disabled={usersSkip === 0} onClick={() => setUsersSkip(Math.max(0, usersSkip - usersLimit))}>Previous</button>
+                            <span style={{ alignSelf: "center" }}>Page {usersSkip / usersLimit + 1} of {Math.ceil(usersTotal / usersLimit)}</span>
+                            <button className="secondary" disabled={usersSkip + usersLimit >= usersTotal} onClick={() => setUsersSkip(usersSkip + usersLimit)}>Next</button>
+                        </div>
+                    )}
                 </section>
             )}
         </div>
@@ -8,22 +8,30 @@ function InternDashboard() {
     const [evaluations, setEvaluations] = useState<any[]>([]);
     const [total, setTotal] = useState(0);
     const [page, setPage] = useState(0);
+    const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const limit = 5;
+    const [details, setDetails] = useState<{ [key: number]: any }>({});
     const [feedback, setFeedback] = useState("");
     const [loading, setLoading] = useState(true);
     const { showToast } = useToast();
 
-    const fetchEvaluations = async () => {
+    const fetchEvaluations = async (cursor: string | undefined = cursors[page]) => {
         setLoading(true);
         try {
             const res = await api.get("/intern/evaluations", {
                 params: {
-                    skip: page * limit,
-                    limit: limit
+                    cursor: cursor,
+                    limit: limit,
+                    // The total only changes the page count, so skip the COUNT after the first page
+                    include_total: cursor === undefined
                 }
             });
             setEvaluations(res.data.evaluations || []);
-            setTotal(res.data.total || 0);
+            if (res.data.total !== null && res.data.total !== undefined) {
+                setTotal(res.data.total);
+            }
+            setNextCursor(res.data.next_cursor || null);
         } catch (err) {
             console.error(err);
             showToast("Failed to load evaluations", "error");
@@ -36,6 +44,34 @@ function InternDashboard() {
         fetchEvaluations();
     }, [page]);
 
+    // Keyset pagination: cursors[n] fetches page n, so Previous can step back
+    const goToNextPage = () => {
+        if (!nextCursor) return;
+        setCursors([...cursors.slice(0, page + 1), nextCursor]);
+        setPage(page + 1);
+    };
+
+    // Listings carry comment previews only; the full record (comments, AI report) is fetched per card
+    const loadDetails = async (evaluationId: number) => {
+        try {
+            const res = await api.get(`/evaluations/${evaluationId}`);
+            setDetails((prev) => ({ ...prev, [evaluationId]: res.data }));
+            return res.data;
+        } catch (err) {
+            console.error(err);
+            showToast("Failed to load evaluation", "error");
+        }
+    };
+
+    const downloadPDF = async (evaluationId: number) => {
+        try {
+            await downloadEvaluationPDF(evaluationId);
+        } catch (err) {
+            console.error(err);
+            showToast("Failed to download PDF", "error");
+        }
+    };
+
     const submitFeedback = async (evaluationId: number) => {
         if (!feedback) {
             showToast("Please provide your feedback", "error");
@@ -51,9 +87,11 @@ function InternDashboard() {
             showToast("Feedback Submitted Successfully", "success");
             fetchEvaluations();
             setFeedback("");
-        } catch (err) {
+        } catch (err: any) {
             console.error(err);
-            showToast("Error submitting feedback", "error");
+            showToast(err.response?.data?.detail || "Error submitting feedback", "error");
+            // 409: someone else already moved it on; show the current state
+            if (err.response?.status === 409) fetchEvaluations();
         } finally {
             setLoading(false);
         }
@@ -93,7 +131,7 @@ function InternDashboard() {
                                 </span>
                             </div>
 
-                            <StepIndicator status={evalItem.status} hasReport={!!evalItem.report} />
+                            <StepIndicator status={evalItem.status} hasReport={evalItem.has_report} />
 
                             <div style={{ display: "grid", gridTemplateColumns: "1fr 1fr", gap: "2rem", marginBottom: "2rem", padding: "1.5rem", background: "rgba(255,255,255,0.03)", borderRadius: "12px" }}>
                                 <div>
@@ -102,7 +140,14 @@ function InternDashboard() {
                                 </div>
                                 <div>
                                     <label>Manager Comment</label>
-                                    <p style={{ color: "var(--text-primary)", fontSize: "0.95rem" }}>{evalItem.manager_comment}</p>
+                                    <p style={{ color: "var(--text-primary)", fontSize: "0.95rem" }}>
+                                        {details[evalItem.id]?.manager_comment ?? evalItem.manager_comment_preview}
+                                    </p>
+                                    {!details[evalItem.id] && evalItem.manager_comment_preview.length >= 200 && (
+                                        <button onClick={() => loadDetails(evalItem.id)} className="secondary" style={{ padding: "4px 10px", fontSize: "0.8rem" }}>
+                                            Show full comment
+                                        </button>
+                                    )}
                                 </div>
                             </div>
 
@@ -121,16 +166,22 @@ function InternDashboard() {
                                 </div>
                             )}
 
-                            {evalItem.status === "completed" && evalItem.report && (
+                            {evalItem.status === "completed" && evalItem.has_report && (
                                 <div style={{ borderTop: "1px solid var(--border-glass)", paddingTop: "1.5rem" }}>
-                                    <div style={{ background: "rgba(0,0,0,0.2)", padding: "1.5rem", borderRadius: "12px", marginBottom: "1.5rem" }}>
-                                        <h4 style={{ color: "var(--accent)", marginBottom: "1rem" }}>AI Performance Analysis</h4>
-                                        <div style={{ whiteSpace: "pre-wrap", color: "var(--text-secondary)", lineHeight: 1.6 }}>
-                                            {evalItem.report}
+                                    {details[evalItem.id] ? (
+                                        <div style={{ background: "rgba(0,0,0,0.2)", padding: "1.5rem", borderRadius: "12px", marginBottom: "1.5rem" }}>
+                                            <h4 style={{ color: "var(--accent)", marginBottom: "1rem" }}>AI Performance Analysis</h4>
+                                            <div style={{ whiteSpace: "pre-wrap", color: "var(--text-secondary)", lineHeight: 1.6 }}>
+                                                {details[evalItem.id].report}
+                                            </div>
                                         </div>
-                                    </div>
+                                    ) : (
+                                        <button onClick={() => loadDetails(evalItem.id)} className="secondary" style={{ width: "100%", marginBottom: "1rem" }}>
+                                            View AI Report
+                                        </button>
+                                    )}
                                     <button
-                                        onClick={() => downloadEvaluationPDF(evalItem)}
+                                        onClick={() => downloadPDF(evalItem.id)}
                                         style={{ width: "100%" }}
                                     >
                                         Download Report (PDF)
@@ -154,8 +205,8 @@ function InternDashboard() {
                         <span style={{ alignSelf: "center" }}>Page {page + 1} of {Math.ceil(total / limit)}</span>
                         <button
                             className="secondary"
-                            disabled={(page + 1) * limit >= total}
-                            onClick={() => setPage(page + 1)}
+                            disabled={!nextCursor}
+                            onClick={goToNextPage}
                         >
                             Next
                         </button>
@@ -1,5 +1,5 @@
 import { useState, useEffect } from "react";
-import api from "../services/api";
+import api, { streamReport } from "../services/api";
 import StepIndicator from "../components/StepIndicator";
 import { useToast } from "../components/ToastContext";
 import { downloadEvaluationPDF } from "../services/pdfService";
@@ -13,23 +13,31 @@ function ManagerDashboard() {
     const [total, setTotal] = useState(0);
     const [search, setSearch] = useState("");
     const [page, setPage] = useState(0);
+    const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const limit = 5;
     const [reports, setReports] = useState<{ [key: number]: string }>({});
+    const [details, setDetails] = useState<{ [key: number]: any }>({});
     const [loading, setLoading] = useState(true);
     const { showToast } = useToast();
 
-    const fetchEvaluations = async () => {
+    const fetchEvaluations = async (cursor: string | undefined = cursors[page]) => {
         setLoading(true);
         try {
             const res = await api.get("/manager/evaluations", {
                 params: {
                     search: search || undefined,
-                    skip: page * limit,
-                    limit: limit
+                    cursor: cursor,
+                    limit: limit,
+                    // The total only changes the page count, so skip the COUNT after the first page
+                    include_total: cursor === undefined
                 }
             });
             setEvaluations(res.data.evaluations || []);
-            setTotal(res.data.total || 0);
+            if (res.data.total !== null && res.data.total !== undefined) {
+                setTotal(res.data.total);
+            }
+            setNextCursor(res.data.next_cursor || null);
         } catch (err) {
             console.error(err);
             showToast("Failed to load evaluations", "error");
@@ -42,6 +50,18 @@ function ManagerDashboard() {
         fetchEvaluations();
     }, [page]);
 
+    // Keyset pagination: cursors[n] fetches page n, so Previous can step back
+    const goToNextPage = () => {
+        if (!nextCursor) return;
+        setCursors([...cursors.slice(0, page + 1), nextCursor]);
+        setPage(page + 1);
+    };
+
+    const resetPaging = () => {
+        setCursors([undefined]);
+        setPage(0);
+    };
+
     const handleSubmit = async () => {
         if (!internId || !comment) {
             showToast("Please fill in all fields", "error");
@@ -71,18 +91,65 @@ function ManagerDashboard() {
         }
     };
 
+    // CSV with columns intern_id, rating, manager_comment, months_worked
+    const handleCsvUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
+        const file = e.target.files?.[0];
+        e.target.value = "";
+        if (!file) return;
+
+        const form = new FormData();
+        form.append("file", file);
+        setLoading(true);
+        try {
+            const res = await api.post("/create-evaluations/bulk", form);
+            const { created, failed, errors } = res.data;
+            if (failed > 0) {
+                showToast(`${created} created, ${failed} failed (row ${errors[0].row}: ${errors[0].error})`, "error");
+            } else {
+                showToast(`${created} evaluations created`, "success");
+            }
+            resetPaging();
+            fetchEvaluations(undefined);
+        } catch (err: any) {
+            console.error(err);
+            showToast(err.response?.data?.detail || "Error uploading evaluations", "error");
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    // Listings carry comment previews only; the full record (comments, AI report) is fetched per card
+    const loadDetails = async (evaluationId: number) => {
+        try {
+            const res = await api.get(`/evaluations/${evaluationId}`);
+            setDetails((prev) => ({ ...prev, [evaluationId]: res.data }));
+            return res.data;
+        } catch (err) {
+            console.error(err);
+            showToast("Failed to load evaluation", "error");
+        }
+    };
+
+    const downloadPDF = async (evaluationId: number) => {
+        try {
+            await downloadEvaluationPDF(evaluationId);
+        } catch (err) {
+            console.error(err);
+            showToast("Failed to download PDF", "error");
+        }
+    };
+
     const generateReport = async (evaluationId: number) => {
         try {
-            const res = await api.post(`/generate-report/${evaluationId}`);
-            setReports((prev) => ({
-                ...prev,
-                [evaluationId]: res.data.report,
-            }));
+            // The report fills in as Gemini writes it
+            await streamReport(evaluationId, (text) => {
+                setReports((prev) => ({ ...prev, [evaluationId]: text }));
+            });
             showToast("Report Generated", "success");
             fetchEvaluations();
-        } catch (err) {
+        } catch (err: any) {
             console.error(err);
-            showToast("Error generating report", "error");
+            showToast(err.status === 409 ? err.message : "Error generating report", "error");
         }
     };
 
@@ -152,6 +219,10 @@ function ManagerDashboard() {
                 >
                     {loading ? "Creating..." : "Create Evaluation"}
                 </button>
+                <div style={{ marginTop: "1rem" }}>
+                    <label>Or upload a CSV (intern_id, rating, manager_comment, months_worked)</label>
+                    <input type="file" accept=".csv,text/csv" onChange={handleCsvUpload} disabled={loading} />
+                </div>
             </section>
 
             <section>
@@ -162,10 +233,10 @@ function ManagerDashboard() {
                             placeholder="Search intern email..."
                             value={search}
                             onChange={(e) => setSearch(e.target.value)}
-                            onKeyDown={(e) => e.key === 'Enter' && (setPage(0), fetchEvaluations())}
+                            onKeyDown={(e) => e.key === 'Enter' && (resetPaging(), fetchEvaluations(undefined))}
                             style={{ padding: "8px 12px" }}
                         />
-                        <button onClick={() => { setPage(0); fetchEvaluations(); }} className="secondary" style={{ padding: "8px 16px" }}>Search</button>
+                        <button onClick={() => { resetPaging(); fetchEvaluations(undefined); }} className="secondary" style={{ padding: "8px 16px" }}>Search</button>
                     </div>
                 </div>
 
@@ -182,7 +253,7 @@ function ManagerDashboard() {
                                 </span>
                             </div>
 
-                            <StepIndicator status={evalItem.status} hasReport={!!evalItem.report} />
+                            <StepIndicator status={evalItem.status} hasReport={evalItem.has_report} />
 
                             <div style={{ display: "flex", gap: "2rem", marginBottom: "1.5rem" }}>
                                 <div>
@@ -197,27 +268,38 @@ function ManagerDashboard() {
 
                             <div style={{ marginBottom: "1rem" }}>
                                 <label style={{ fontSize: "0.75rem" }}>Your Comment</label>
-                                <p style={{ color: "var(--text-primary)", fontSize: "0.95rem" }}>{evalItem.manager_comment}</p>
+                                <p style={{ color: "var(--text-primary)", fontSize: "0.95rem" }}>
+                                    {details[evalItem.id]?.manager_comment ?? evalItem.manager_comment_preview}
+                                </p>
+                                {!details[evalItem.id] && evalItem.manager_comment_preview.length >= 200 && (
+                                    <button onClick={() => loadDetails(evalItem.id)} className="secondary" style={{ padding: "4px 10px", fontSize: "0.8rem" }}>
+                                        Show full comment
+                                    </button>
+                                )}
                             </div>
 
                             {evalItem.status === "completed" && (
                                 <div style={{ borderTop: "1px solid var(--border-glass)", paddingTop: "1rem", marginTop: "1rem" }}>
-                                    {(evalItem.report || reports[evalItem.id]) ? (
+                                    {(details[evalItem.id]?.report || reports[evalItem.id]) ? (
                                         <>
                                             <div style={{ background: "rgba(0,0,0,0.2)", padding: "1rem", borderRadius: "8px", marginBottom: "1rem" }}>
                                                 <h4 style={{ fontSize: "0.9rem", color: "var(--accent)", marginBottom: "0.5rem" }}>AI Performance Analysis</h4>
                                                 <div style={{ whiteSpace: "pre-wrap", fontSize: "0.875rem", color: "var(--text-secondary)" }}>
-                                                    {evalItem.report || reports[evalItem.id]}
+                                                    {details[evalItem.id]?.report || reports[evalItem.id]}
                                                 </div>
                                             </div>
                                             <button
-                                                onClick={() => downloadEvaluationPDF(evalItem)}
+                                                onClick={() => downloadPDF(evalItem.id)}
                                                 className="btn-primary"
                                                 style={{ width: "100%", fontSize: "0.85rem" }}
                                             >
                                                 Download Report (PDF)
                                             </button>
                                         </>
+                                    ) : evalItem.has_report ? (
+                                        <button onClick={() => loadDetails(evalItem.id)} className="secondary" style={{ width: "100%" }}>
+                                            View AI Report
+                                        </button>
                                     ) : (
                                         <button onClick={() => generateReport(evalItem.id)} className="secondary" style={{ width: "100%" }}>
                                             Generate AI Report
@@ -246,8 +328,8 @@ function ManagerDashboard() {
                         <span style={{ alignSelf: "center" }}>Page {page + 1} of {Math.ceil(total / limit)}</span>
                         <button
                             className="secondary"
-                            disabled={(page + 1) * limit >= total}
-                            onClick={() => setPage(page + 1)}
+                            disabled={!nextCursor}
+                            onClick={goToNextPage}
                         >
                             Next
                         </button>
@@ -4,6 +4,13 @@ const api = axios.create({
     baseURL: import.meta.env.VITE_API_URL || "/api",
 });
 
+// Conditional GETs: the dashboard reads send back the ETag of the copy we already
+// have, and a 304 is answered from that copy. Keyed by token and full URL (with params).
+const ETAG_CACHE_SIZE = 100;
+const etagCache = new Map<string, { etag: string; data: any }>();
+
+const cacheKey = (config: any) => `${localStorage.getItem("token") || ""}|${api.getUri(config)}`;
+
 api.interceptors.request.use((config) => {
     const token = localStorage.getItem("token");
 
@@ -11,7 +18,90 @@ api.interceptors.request.use((config) => {
         config.headers.Authorization = `Bearer ${token}`;
     }
 
+    if ((config.method || "get").toLowerCase() === "get" && config.responseType !== "blob") {
+        const cached = etagCache.get(cacheKey(config));
+        if (cached) {
+            config.headers["If-None-Match"] = cached.etag;
+        }
+        config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304;
+    }
+
     return config;
 });
 
-export default api;
\ No newline at end of file
+api.interceptors.response.use((response) => {
+    if ((response.config.method || "get").toLowerCase() !== "get") {
+        return response;
+    }
+
+    const key = cacheKey(response.config);
+    if (response.status === 304) {
+        const cached = etagCache.get(key);
+        if (cached) {
+            // Most recently used entries are evicted last
+            etagCache.delete(key);
+            etagCache.set(key, cached);
+            return { ...response, status: 200, data: cached.data };
+        }
+        return response;
+    }
+
+    const etag = response.headers["etag"];
+    if (etag) {
+        etagCache.delete(key);
+        etagCache.set(key, { etag, data: response.data });
+        if (etagCache.size > ETAG_CACHE_SIZE) {
+            etagCache.delete(etagCache.keys().next().value as string);
+        }
+    }
+    return response;
+});
+
+// POST /generate-report/{id}/stream: Server-Sent Events read off a fetch body (EventSource
+// can't send the Authorization header or POST). onText gets the report so far after every
+// chunk; resolves with the complete report once the server has saved it.
+export const streamReport = async (evaluationId: number, onText: (text: string) => void) => {
+    const token = localStorage.getItem("token");
+    const response = await fetch(api.getUri({ url: `/generate-report/${evaluationId}/stream` }), {
+        method: "POST",
+        headers: { Accept: "text/event-stream", ...(token ? { Authorization: `Bearer ${token}` } : {}) },
+    });
+    if (!response.ok || !response.body) {
+        // 409: a background job is already generating this report
+        const detail = await response.json().then((body) => body.detail).catch(() => null);
+        throw Object.assign(new Error(detail || `Report stream failed with status ${response.status}`), { status: response.status });
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = "";
+    let report = "";
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let boundary = buffered.indexOf("\n\n");
+        while (boundary !== -1) {
+            const lines = buffered.slice(0, boundary).split("\n");
+            buffered = buffered.slice(boundary + 2);
+            boundary = buffered.indexOf("\n\n");
+
+            const event = lines.find((line) => line.startsWith("event: "))?.slice(7);
+            const data = JSON.parse(lines.find((line) => line.startsWith("data: "))?.slice(6) || "{}");
+            if (event === "chunk") {
+                report += data.text;
+                onText(report);
+            } else if (event === "error") {
+                throw new Error(data.detail);
+            } else if (event === "done") {
+                return report;
+            }
+        }
+    }
+    throw new Error("Report stream ended early");
+};
+
+export default api;